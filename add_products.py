@@ -3,17 +3,7 @@
 Script para agregar productos de ejemplo (cremas, cosméticos, etc.)
 """
 
-import os
-from supabase import create_client
-from dotenv import load_dotenv
-
-# Cargar variables de entorno
-load_dotenv()
-
-# Configurar Supabase
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
-supabase = create_client(supabase_url, supabase_key)
+from catalog_import import seed
 
 # Productos de ejemplo
 products = [
@@ -101,17 +91,7 @@ products = [
 
 def main():
     print("🧴 Agregando productos de skincare...\n")
-    
-    success_count = 0
-    for product in products:
-        try:
-            response = supabase.table('products').insert(product).execute()
-            print(f"✅ {product['name']} - ₡{product['price']:,} (Stock: {product['stock']})")
-            success_count += 1
-        except Exception as e:
-            print(f"❌ Error al agregar {product['name']}: {e}")
-    
-    print(f"\n🎉 Proceso completado: {success_count}/{len(products)} productos agregados exitosamente")
+    seed("products", products, "seed-products")
 
 if __name__ == "__main__":
     main()
@@ -3,17 +3,7 @@
 Script para agregar todos los servicios de Kalai Medical Center a la base de datos
 """
 
-import os
-from supabase import create_client
-from dotenv import load_dotenv
-
-# Cargar variables de entorno
-load_dotenv()
-
-# Configurar Supabase
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
-supabase = create_client(supabase_url, supabase_key)
+from catalog_import import get_client, seed
 
 # Servicios a agregar
 services = [
@@ -160,7 +150,7 @@ def main():
     
     # Primero, eliminar los productos de ejemplo anteriores (opcional)
     try:
-        response = supabase.table('products').delete().in_('name', [
+        response = get_client().table('products').delete().in_('name', [
             'Limpieza Facial Profunda',
             'Masaje Relajante',
             'Tratamiento Anti-Edad',
@@ -170,17 +160,8 @@ def main():
     except Exception as e:
         print(f"⚠️  Error al eliminar productos anteriores: {e}\n")
     
-    # Agregar nuevos servicios
-    success_count = 0
-    for service in services:
-        try:
-            response = supabase.table('products').insert(service).execute()
-            print(f"✅ {service['name']} - ${service['price']} ({service['category']})")
-            success_count += 1
-        except Exception as e:
-            print(f"❌ Error al agregar {service['name']}: {e}")
-    
-    print(f"\n🎉 Proceso completado: {success_count}/{len(services)} servicios agregados exitosamente")
+    # Agregar nuevos servicios (upsert por lotes, idempotente)
+    seed("products", services, "seed-services")
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
 from jose.exceptions import JWTError
 from datetime import datetime, timedelta
+import hashlib
+import time
+from app.cache import TTLCache
 from app.config import settings
 
 security = HTTPBearer()
@@ -10,6 +13,13 @@ security = HTTPBearer()
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Verified payloads keyed by sha256(token); entries never outlive the token's exp
+token_cache = TTLCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.TOKEN_CACHE_TTL,
+)
+_token_cache_secret = settings.SECRET_KEY
+
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token"""
@@ -22,8 +32,19 @@ def create_access_token(data: dict) -> str:
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Verify JWT token"""
+    global _token_cache_secret
+    if settings.SECRET_KEY != _token_cache_secret:
+        # Key rotated: tokens verified with the old key must be checked again
+        token_cache.clear()
+        _token_cache_secret = settings.SECRET_KEY
+
+    token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
@@ -31,6 +52,8 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
+        if "exp" in payload:
+            token_cache.set(cache_key, payload, ttl=payload["exp"] - time.time())
         return payload
     except JWTError:
         raise HTTPException(
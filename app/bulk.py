@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Annotated, Any, Dict, List, Optional, Type
+from uuid import UUID
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from app.config import settings
+from app.models import BulkItemResult
+
+
+# Id column type per table: one id that does not cast (BIGINT / UUID) would
+# otherwise fail the whole chunk's statement on Supabase
+ID_ADAPTERS = {
+    "products": TypeAdapter(Annotated[int, Field(gt=0, lt=2 ** 63)]),
+    "treatments": TypeAdapter(UUID),
+}
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _validation_message(error: ValidationError, root: str = "item") -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or root}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def parse_id(table: str, value: Any) -> Any:
+    """Id converted to its column type (UUIDs as strings); raises ValidationError"""
+    item_id = ID_ADAPTERS[table].validate_python(value)
+    return str(item_id) if isinstance(item_id, UUID) else item_id
+
+
+def _raw_id(value: Any) -> Optional[Any]:
+    """Invalid id as sent, when it fits BulkItemResult.id"""
+    return value if isinstance(value, (int, str)) and not isinstance(value, bool) else None
+
+
+async def run_bulk(
+    repository,
+    request: BaseModel,
+    create_model: Type[BaseModel],
+    update_model: Type[BaseModel],
+    create_defaults: Dict[str, Any]
+) -> List[BulkItemResult]:
+    """Validate and apply a batch of creates, partial updates and deletes.
+
+    Every item is validated on its own so one bad item does not reject the
+    batch. Valid items are written in chunks of BULK_CHUNK_SIZE, one
+    repository call per chunk: multi-row inserts, partial updates (a single
+    bulk_update_* SQL function call on Supabase, see database/schema.sql)
+    and `in` filtered deletes. A failing chunk only fails its own items.
+    """
+    results: List[BulkItemResult] = []
+    chunk_size = settings.BULK_CHUNK_SIZE
+    now = datetime.utcnow().isoformat()
+
+    # Creates
+    pending = []
+    for index, item in enumerate(request.create):
+        try:
+            row = create_model.model_validate(item).model_dump()
+        except ValidationError as e:
+            results.append(BulkItemResult(op="create", index=index, status=422, error=_validation_message(e)))
+            continue
+        pending.append((index, {**row, **create_defaults, "created_at": now, "updated_at": now}))
+
+    for chunk in _chunks(pending, chunk_size):
+        try:
+            created = await repository.insert([row for _, row in chunk])
+        except Exception as e:
+            results.extend(BulkItemResult(op="create", index=index, status=500, error=str(e)) for index, _ in chunk)
+            continue
+        for (index, _), row in zip(chunk, created):
+            results.append(BulkItemResult(op="create", index=index, status=201, id=row["id"]))
+
+    # Partial updates
+    pending = []
+    seen = set()
+    for index, item in enumerate(request.update):
+        item = dict(item)
+        item_id = item.pop("id", None)
+        if item_id is None:
+            results.append(BulkItemResult(op="update", index=index, status=422, error="id: Field required"))
+            continue
+        try:
+            item_id = parse_id(repository.table, item_id)
+        except ValidationError as e:
+            results.append(BulkItemResult(op="update", index=index, status=422, id=_raw_id(item_id), error=_validation_message(e, root="id")))
+            continue
+        if str(item_id) in seen:
+            results.append(BulkItemResult(op="update", index=index, status=409, id=item_id, error="Duplicate id in batch"))
+            continue
+        try:
+            changes = update_model.model_validate(item).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            results.append(BulkItemResult(op="update", index=index, status=422, id=item_id, error=_validation_message(e)))
+            continue
+        if not changes:
+            results.append(BulkItemResult(op="update", index=index, status=422, id=item_id, error="No fields to update"))
+            continue
+        seen.add(str(item_id))
+        pending.append((index, item_id, changes))
+
+    for chunk in _chunks(pending, chunk_size):
+        items = [{**changes, "id": item_id} for _, item_id, changes in chunk]
+        try:
+            updated = {str(row["id"]) for row in await repository.update_many(items)}
+        except Exception as e:
+            results.extend(BulkItemResult(op="update", index=index, status=500, id=item_id, error=str(e)) for index, item_id, _ in chunk)
+            continue
+        for index, item_id, _ in chunk:
+            if str(item_id) in updated:
+                results.append(BulkItemResult(op="update", index=index, status=200, id=item_id))
+            else:
+                results.append(BulkItemResult(op="update", index=index, status=404, id=item_id, error="Not found"))
+
+    # Deletes
+    pending = []
+    for index, item_id in enumerate(request.delete):
+        try:
+            pending.append((index, parse_id(repository.table, item_id)))
+        except ValidationError as e:
+            results.append(BulkItemResult(op="delete", index=index, status=422, id=_raw_id(item_id), error=_validation_message(e, root="id")))
+
+    for chunk in _chunks(pending, chunk_size):
+        try:
+            removed = await repository.delete_many([item_id for _, item_id in chunk])
+            deleted = {str(row["id"]) for row in removed}
+        except Exception as e:
+            results.extend(BulkItemResult(op="delete", index=index, status=500, id=item_id, error=str(e)) for index, item_id in chunk)
+            continue
+        for index, item_id in chunk:
+            if str(item_id) in deleted:
+                results.append(BulkItemResult(op="delete", index=index, status=204, id=item_id))
+            else:
+                results.append(BulkItemResult(op="delete", index=index, status=404, id=item_id, error="Not found"))
+
+    order = {"create": 0, "update": 1, "delete": 2}
+    results.sort(key=lambda result: (order[result.op], result.index))
+    return results
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.config import settings
+
+
+class TTLCache:
+    """Bounded in-memory LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on a miss/expired entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full.
+
+        `ttl` can shorten the lifetime of this entry below the cache TTL.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches the predicate"""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Public listings keyed by (table, category, active_only)
+catalog_cache = TTLCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL,
+)
+
+# Bumped on every invalidation of a table, so a listing fetch that started
+# before a write can tell its result is outdated and must not be cached
+_generations: Dict[str, int] = {}
+
+
+def table_generation(table: str) -> int:
+    return _generations.get(table, 0)
+
+
+def invalidate_table(table: str) -> None:
+    """Invalidate all cached listings of a table after an admin write"""
+    _generations[table] = table_generation(table) + 1
+    catalog_cache.invalidate(lambda key: key[0] == table)
+
+
+def invalidate_categories(table: str, categories: set) -> None:
+    """Invalidate the unfiltered listings of a table and those of the given categories"""
+    _generations[table] = table_generation(table) + 1
+    catalog_cache.invalidate(lambda key: key[0] == table and (key[1] is None or key[1] in categories))
@@ -0,0 +1,86 @@
+import time
+from typing import Dict, Optional
+from app.config import settings
+from app.resilience import UpstreamUnavailable
+
+
+def summarize(counts: Dict[str, int]) -> dict:
+    """Categories with a positive count, in stable case-insensitive order"""
+    categories = sorted(
+        (category for category, count in counts.items() if count > 0),
+        key=lambda category: (category.casefold(), category)
+    )
+    return {
+        "categories": categories,
+        "counts": {category: counts[category] for category in categories}
+    }
+
+
+class CategoryIndex:
+    """Active item counts per category, kept in sync with admin writes.
+
+    Counts are loaded with the repository's aggregate query (an SQL view on
+    Supabase, see database/schema.sql) and then adjusted incrementally from
+    the rows touched by admin writes. The index is reloaded once it is older
+    than the catalog cache TTL, or when a write changed a row whose previous
+    values are unknown. If that reload fails upstream, the previous counts
+    keep being served and `stale` is set. Counts loaded while a write was
+    applied may predate it, so they are used but not marked fresh.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._counts: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._loaded_once = False
+        self._generation = 0
+        self.stale = False
+
+    def is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.CATALOG_CACHE_TTL
+        )
+
+    async def load(self, repository) -> None:
+        generation = self._generation
+        self._counts = await repository.category_counts()
+        self._loaded_at = time.monotonic() if generation == self._generation else None
+        self._loaded_once = True
+
+    async def snapshot(self, repository) -> dict:
+        """Categories with at least one active item, in stable sorted order"""
+        self.stale = False
+        if not self.is_fresh():
+            try:
+                await self.load(repository)
+            except UpstreamUnavailable:
+                if not self._loaded_once:
+                    raise
+                self.stale = True
+
+        return summarize(self._counts)
+
+    def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """Move one row's contribution from its old values to its new ones"""
+        self._generation += 1
+        if self._loaded_at is None:
+            return
+        self._adjust(old, -1)
+        self._adjust(new, 1)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+
+    def _adjust(self, row: Optional[dict], delta: int) -> None:
+        if not row or not row.get("category") or not row.get("is_active"):
+            return
+        category = row["category"]
+        self._counts[category] = max(self._counts.get(category, 0) + delta, 0)
+
+
+category_indexes = {
+    "products": CategoryIndex("products"),
+    "treatments": CategoryIndex("treatments"),
+}
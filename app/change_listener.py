@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+from app.config import settings
+from app.invalidation import catalog_changed
+
+try:
+    import asyncpg
+except ImportError:  # optional, the listener stays off without it
+    asyncpg = None
+
+CATALOG_TABLES = ("products", "treatments")
+
+# Columns whose change moves a row between categories or in/out of the catalog
+CATEGORY_FIELDS = ("category", "is_active")
+
+logger = logging.getLogger(__name__)
+
+
+def _moved(old: Optional[dict], new: Optional[dict]) -> bool:
+    if old is None or new is None:
+        return True
+    return any(old.get(field) != new.get(field) for field in CATEGORY_FIELDS)
+
+
+class ChangeListener:
+    """Invalidates the in-process caches from Postgres row change events.
+
+    The notify_catalog_change trigger (database/schema.sql) sends the table,
+    operation and the id, category and is_active of the row before and after
+    every write, including edits made in the Supabase dashboard or by the
+    import scripts. Events are handled in batches: the changed rows are read
+    back with one get_many per table and passed to catalog_changed, so only
+    the listings, snapshot, category counts and search entries they affect
+    are dropped. A table with more than CHANGE_LISTENER_BULK_THRESHOLD
+    changes in a batch is invalidated as a whole instead.
+
+    Events from this worker's own admin writes arrive too; handling them
+    again is harmless because category counts are only adjusted in place
+    when the row stayed in the same category (and reindexed otherwise).
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._get_repository = None
+        self.connected = False
+        self.events = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.DATABASE_URL) and bool(settings.CHANGE_LISTENER_CHANNEL) and asyncpg is not None
+
+    def start(self, get_repository) -> None:
+        """Connect and listen in the background (called at startup)"""
+        if not self.enabled:
+            if settings.DATABASE_URL and asyncpg is None:
+                logger.warning("DATABASE_URL is set but asyncpg is not installed, change events are ignored")
+            return
+        self._get_repository = get_repository
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.connected = False
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change event: %s", payload)
+            return
+        if event.get("table") in CATALOG_TABLES:
+            self._queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        consumer = asyncio.create_task(self._consume())
+        delay = 1.0
+        try:
+            while True:
+                try:
+                    await self._listen()
+                    delay = 1.0
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Change listener connection failed, retrying in %.0fs", delay)
+                self.connected = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.CHANGE_LISTENER_MAX_BACKOFF)
+        finally:
+            consumer.cancel()
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(settings.DATABASE_URL)
+        closed = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(settings.CHANGE_LISTENER_CHANNEL, self._on_notify)
+            self.connected = True
+            # Anything written while disconnected was missed
+            for table in CATALOG_TABLES:
+                catalog_changed(table, reindex=True)
+            await closed.wait()
+        finally:
+            await connection.close()
+
+    async def _consume(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self.handle(batch)
+            except Exception:
+                logger.exception("Failed to apply %d change events", len(batch))
+                for table in CATALOG_TABLES:
+                    catalog_changed(table, reindex=True)
+
+    async def handle(self, events: List[dict]) -> None:
+        """Apply a batch of change events to the caches"""
+        self.events += len(events)
+        by_table: Dict[str, List[dict]] = {}
+        for event in events:
+            by_table.setdefault(event["table"], []).append(event)
+
+        for table, table_events in by_table.items():
+            if len(table_events) > settings.CHANGE_LISTENER_BULK_THRESHOLD:
+                catalog_changed(table, reindex=True)
+                continue
+
+            # Current rows for the search index, which needs more than the event carries
+            ids = list({event["new"]["id"] for event in table_events if event.get("new")})
+            rows = {row["id"]: row for row in await self._get_repository(table).get_many(ids)}
+            for event in table_events:
+                old = event.get("old")
+                new = event.get("new")
+                if new is not None:
+                    # None when the row was deleted again before we read it
+                    new = rows.get(new["id"])
+                catalog_changed(table, old=old, new=new, reindex=_moved(old, new))
+
+
+change_listener = ChangeListener()
@@ -0,0 +1,176 @@
+import asyncio
+import gzip
+import time
+from typing import Dict, Optional
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from app.config import settings
+from app.http_cache import encoded_etag
+from app.profiling import current_profile
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip only without it
+    brotli = None
+
+
+def supported_encodings() -> tuple:
+    """Encodings we can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best encoding accepted by the client (q-values honoured), or None"""
+    if not accept_encoding:
+        return None
+
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Compress a body; `fast` trades ratio for speed on per-response compression"""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_DYNAMIC_QUALITY if fast else settings.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.GZIP_COMPRESSLEVEL if fast else 9, mtime=0)
+
+
+class EncodedPayload:
+    """Serialized JSON body of a cacheable response plus its compressed variants.
+
+    Instances live in the catalog cache next to the ETag, so each variant is
+    compressed at most once per catalog version. Compression runs in a worker
+    thread (brotli at BROTLI_QUALITY can take seconds on large catalogs) and
+    concurrent requests for the same variant share it.
+    """
+
+    def __init__(self, body: bytes, fast: bool = False):
+        self.body = body
+        self.fast = fast  # single-use payloads are compressed at the dynamic level
+        self._variants: Dict[str, bytes] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def served_encoding(self, encoding: Optional[str]) -> Optional[str]:
+        """Encoding of the body variant() returns for a negotiated encoding"""
+        if encoding is None or len(self.body) < settings.COMPRESSION_MIN_SIZE:
+            return None
+        return encoding
+
+    async def variant(self, encoding: Optional[str]) -> bytes:
+        if self.served_encoding(encoding) is None:
+            return self.body
+        compressed = self._variants.get(encoding)
+        if compressed is not None:
+            return compressed
+
+        pending = self._pending.get(encoding)
+        if pending is None or (pending.done() and pending.exception() is not None):
+            pending = self._pending[encoding] = asyncio.ensure_future(
+                asyncio.to_thread(compress, self.body, encoding, self.fast)
+            )
+        # Shielded: a client disconnecting must not cancel the shared compression
+        started = time.perf_counter()
+        compressed = await asyncio.shield(pending)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add_threaded("compression", time.perf_counter() - started)
+        self._variants[encoding] = compressed
+        self._pending.pop(encoding, None)
+        return compressed
+
+
+class BufferResponse(Response):
+    """Response that also accepts a memoryview body (shared snapshots), sent without copying"""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, memoryview):
+            return content
+        return super().render(content)
+
+
+async def payload_response(request: Request, payload: EncodedPayload, headers: Optional[dict] = None) -> Response:
+    """JSON response for a precomputed payload, compressed if the client accepts it"""
+    encoding = payload.served_encoding(negotiate(request.headers.get("accept-encoding")))
+    body = await payload.variant(encoding)
+    response = BufferResponse(content=body, media_type="application/json", headers=headers)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+class CompressionMiddleware:
+    """Compress uncached JSON responses above COMPRESSION_MIN_SIZE.
+
+    Responses that already carry Content-Encoding (precompressed catalog
+    payloads) and streamed bodies pass through untouched. Bodies above
+    COMPRESSION_THREAD_MIN_SIZE (large admin listings) are compressed in a
+    worker thread so they do not block the event loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if scope["type"] == "http":
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                "content-encoding" not in headers
+                and not message.get("more_body", False)
+                and len(body) >= settings.COMPRESSION_MIN_SIZE
+            ):
+                if len(body) >= settings.COMPRESSION_THREAD_MIN_SIZE:
+                    started = time.perf_counter()
+                    body = await asyncio.to_thread(compress, body, encoding, True)
+                    profile = current_profile.get()
+                    if profile is not None:
+                        profile.add_threaded("compression", time.perf_counter() - started)
+                else:
+                    body = compress(body, encoding, fast=True)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                headers["Content-Length"] = str(len(body))
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
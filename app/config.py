@@ -1,20 +1,44 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
-    # Supabase Configuration
-    SUPABASE_URL: str
-    SUPABASE_KEY: str
-    SUPABASE_SERVICE_KEY: str
+    # Data backend: "supabase" or "sqlite" (local/offline runs and benchmarks)
+    DATA_BACKEND: Literal["supabase", "sqlite"] = "supabase"
+    SQLITE_PATH: str = ":memory:"
+    
+    # Supabase Configuration (required when DATA_BACKEND is "supabase")
+    SUPABASE_URL: str = ""
+    SUPABASE_KEY: str = ""
+    SUPABASE_SERVICE_KEY: str = ""
     
     # Database
-    DATABASE_URL: str
+    DATABASE_URL: str = ""
+    DB_MAX_CONNECTIONS: int = 50
+    DB_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    DB_KEEPALIVE_EXPIRY: float = 30.0
+    DB_TIMEOUT: float = 10.0
+    
+    # Upstream reads: per-call timeout, circuit breaker and last-known-good fallback
+    UPSTREAM_TIMEOUT: float = 5.0  # seconds per repository read, 0 disables
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures that open the circuit
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # seconds open before a single trial call
+    STALE_MAX_AGE: float = 86400.0  # seconds a listing can be served stale, 0 disables
+    STALE_REFRESH_INTERVAL: float = 5.0  # seconds between background refresh attempts
+    
+    # Row change events over LISTEN/NOTIFY on DATABASE_URL (needs asyncpg),
+    # see notify_catalog_change in database/schema.sql: the channel must be
+    # the one its pg_notify call sends to, edit both together
+    CHANGE_LISTENER_CHANNEL: str = "catalog_changes"  # empty disables the listener
+    CHANGE_LISTENER_BULK_THRESHOLD: int = 100  # changes per batch above which a table is reloaded whole
+    CHANGE_LISTENER_MAX_BACKOFF: float = 30.0  # seconds between reconnection attempts
     
     # Security
     SECRET_KEY: str = "kalai-medical-center-secret-key-change-in-production"
     ADMIN_USERNAME: str = "admin"
     ADMIN_PASSWORD: str = "kalai2026"
+    TOKEN_CACHE_TTL: float = 300.0  # seconds a verified token is trusted without re-checking
+    TOKEN_CACHE_MAX_ENTRIES: int = 1024
     
     # CORS
     ALLOWED_ORIGINS: List[str] = [
@@ -24,6 +48,59 @@ class Settings(BaseSettings):
         "https://www.silkskincr.com"
     ]
     
+    # Catalog cache
+    CATALOG_CACHE_TTL: float = 60.0  # seconds, 0 disables caching
+    CATALOG_CACHE_MAX_ENTRIES: int = 256
+    
+    # Pagination (opt-in via ?limit= / ?cursor=)
+    DEFAULT_PAGE_SIZE: int = 24
+    MAX_PAGE_SIZE: int = 200
+    
+    # Bulk admin operations
+    BULK_CHUNK_SIZE: int = 100
+    BULK_MAX_ITEMS: int = 1000
+    
+    # HTTP caching for public catalog responses
+    PUBLIC_CACHE_MAX_AGE: int = 60  # seconds
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE: int = 300  # seconds
+    
+    # Catalog snapshot shared by all workers through a memory-mapped file
+    # (e.g. /dev/shm/kalai-catalog), empty keeps one snapshot per worker
+    SHARED_SNAPSHOT_PATH: str = ""
+    
+    # Static catalog export (catalog.<version>.json + latest.json), empty disables
+    CATALOG_EXPORT_DIR: str = ""
+    CATALOG_EXPORT_URL_PATH: str = "/static/catalog"  # StaticFiles mount, "" to leave it to a CDN
+    CATALOG_EXPORT_DEBOUNCE: float = 2.0  # seconds after a write before regenerating
+    CATALOG_EXPORT_KEEP: int = 5  # versioned files kept for clients still on an older latest.json
+    
+    # Serialization of catalog rows: "trusted" (rows from our own tables, schema
+    # checked on the first row) or "validate" (every row through its model)
+    SERIALIZATION_MODE: Literal["trusted", "validate"] = "trusted"
+    
+    # Response compression (gzip, plus brotli when the package is installed)
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes, smaller bodies are sent as is
+    GZIP_COMPRESSLEVEL: int = 6  # per-response compression of uncached bodies
+    BROTLI_QUALITY: int = 5  # cached payloads, compressed once per variant in a worker thread (11 takes seconds on big catalogs)
+    BROTLI_DYNAMIC_QUALITY: int = 4
+    COMPRESSION_THREAD_MIN_SIZE: int = 65536  # bytes, larger uncached bodies are compressed in a worker thread
+    
+    # Concurrency limits per router (0 disables); overflow is rejected with Retry-After
+    PUBLIC_MAX_CONCURRENCY: int = 64
+    PUBLIC_MAX_QUEUE: int = 128
+    ADMIN_MAX_CONCURRENCY: int = 16
+    ADMIN_MAX_QUEUE: int = 32
+    LOGIN_MAX_CONCURRENCY: int = 2
+    LOGIN_MAX_QUEUE: int = 4
+    LIMIT_QUEUE_TIMEOUT: float = 2.0  # seconds a queued request waits for a slot
+    LIMIT_RETRY_AFTER: int = 1  # seconds, sent in Retry-After
+    
+    # Request profiling (admin header or sampling, see app/profiling.py)
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of requests, 0 disables sampling
+    PROFILE_MAX_STORED: int = 50
+    PROFILE_TOP_FUNCTIONS: int = 25
+    
     # WhatsApp
     WHATSAPP_NUMBER: str = "+50688926754"
     
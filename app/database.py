@@ -1,19 +1,66 @@
-from supabase import create_client, Client
+import httpx
+from typing import Dict
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from app.config import settings
+from app.repositories import CatalogRepository, SupabaseRepository, SQLiteRepository
+from app.repositories.sqlite_repo import connect as sqlite_connect
 
-supabase: Client = None
+CATALOG_TABLES = ("products", "treatments")
+
+supabase: AsyncClient = None
+http_client: httpx.AsyncClient = None
+sqlite_connection = None
+repositories: Dict[str, CatalogRepository] = {}
 
 
 async def init_db():
-    """Initialize Supabase client"""
-    global supabase
-    supabase = create_client(
+    """Initialize the data backend selected by DATA_BACKEND"""
+    global supabase, http_client, sqlite_connection
+    if settings.DATA_BACKEND == "sqlite":
+        sqlite_connection = sqlite_connect(settings.SQLITE_PATH)
+        for table in CATALOG_TABLES:
+            repositories[table] = SQLiteRepository(sqlite_connection, table)
+        return sqlite_connection
+
+    # Async Supabase client on a shared keep-alive connection pool
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.DB_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.DB_KEEPALIVE_EXPIRY,
+        ),
+        timeout=settings.DB_TIMEOUT,
+        follow_redirects=True,
+        http2=True,
+    )
+    supabase = await acreate_client(
         settings.SUPABASE_URL,
-        settings.SUPABASE_SERVICE_KEY
+        settings.SUPABASE_SERVICE_KEY,
+        options=AsyncClientOptions(httpx_client=http_client),
     )
+    for table in CATALOG_TABLES:
+        repositories[table] = SupabaseRepository(supabase, table)
     return supabase
 
 
-def get_db() -> Client:
+async def close_db():
+    """Close the shared HTTP connection pool / SQLite connection"""
+    global supabase, http_client, sqlite_connection
+    if http_client is not None:
+        await http_client.aclose()
+    if sqlite_connection is not None:
+        sqlite_connection.close()
+    repositories.clear()
+    http_client = None
+    sqlite_connection = None
+    supabase = None
+
+
+def get_db() -> AsyncClient:
     """Get Supabase client instance"""
     return supabase
+
+
+def get_repository(table: str) -> CatalogRepository:
+    """Get the repository for a catalog table ("products" or "treatments")"""
+    return repositories[table]
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+from app.snapshot import catalog_snapshot
+
+LATEST_FILE = "latest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Unique temp file: every worker runs its own exporter on the same directory
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as file:
+        file.write(data)
+    try:
+        os.chmod(file.name, 0o644)  # mkstemp creates 0600, the files are served publicly
+        os.replace(file.name, path)
+    except BaseException:
+        os.unlink(file.name)
+        raise
+
+
+def write_export(directory: Path, version: str, body: bytes) -> Path:
+    """Write catalog.<version>.json, point latest.json at it and prune old versions"""
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"catalog.{version}.json"
+    if not target.exists():
+        _write_atomic(target, body)
+
+    pointer = {
+        "version": version,
+        "file": target.name,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    _write_atomic(directory / LATEST_FILE, json.dumps(pointer).encode())
+
+    exports = sorted(directory.glob("catalog.*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for old in exports[settings.CATALOG_EXPORT_KEEP:]:
+        if old != target:
+            old.unlink(missing_ok=True)
+    return target
+
+
+class CatalogExporter:
+    """Regenerates the static catalog files in the background.
+
+    Writes are debounced: a burst of admin writes schedules one export that
+    runs CATALOG_EXPORT_DEBOUNCE seconds after the first of them. The file
+    body is the /api/public/catalog snapshot, so both always agree.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self._get_repository = None
+        self.last_version: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.CATALOG_EXPORT_DIR) and self._get_repository is not None
+
+    def start(self, get_repository) -> None:
+        """Enable exports and write the current catalog (called at startup)"""
+        self._get_repository = get_repository
+        self.schedule(delay=0)
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._get_repository = None
+
+    def schedule(self, delay: Optional[float] = None) -> None:
+        """Queue an export; a write during a running export triggers one more"""
+        if not self.enabled:
+            return
+        self._dirty = True
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run(settings.CATALOG_EXPORT_DEBOUNCE if delay is None else delay))
+
+    async def _run(self, delay: float) -> None:
+        while True:
+            await asyncio.sleep(delay)
+            self._dirty = False
+            try:
+                payload, etag = await catalog_snapshot.get(self._get_repository)
+                version = etag.strip('"')
+                await asyncio.to_thread(write_export, Path(settings.CATALOG_EXPORT_DIR), version, payload.body)
+                self.last_version = version
+            except Exception:
+                logger.exception("Catalog export failed")
+            if not self._dirty:
+                return
+            delay = settings.CATALOG_EXPORT_DEBOUNCE
+
+
+catalog_exporter = CatalogExporter()
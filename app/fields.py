@@ -0,0 +1,36 @@
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Columns the API itself needs for cursors and ETags
+INTERNAL_FIELDS = ("id", "created_at", "updated_at")
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """Validate a comma separated `fields=` parameter against the model's fields"""
+    if not fields:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    allowed = set(model.model_fields)
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return tuple(sorted(requested)) or None
+
+
+def select_columns(fields: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    """Columns to fetch for the requested fields (None means all columns)"""
+    if not fields:
+        return None
+    return tuple(sorted(set(fields) | set(INTERNAL_FIELDS)))
+
+
+def project(rows: List[dict], fields: Optional[Tuple[str, ...]]) -> List[dict]:
+    """Strip internal columns that were fetched but not requested"""
+    if not fields:
+        return rows
+    return [{field: row[field] for field in fields if field in row} for row in rows]
@@ -0,0 +1,53 @@
+import hashlib
+from typing import List, Optional
+from fastapi import Request, Response
+from app.config import settings
+
+
+def catalog_version(rows: List[dict]) -> str:
+    """Catalog version of a listing: latest updated_at plus the row count"""
+    latest = max((row.get("updated_at") or "" for row in rows), default="")
+    return f"{latest}:{len(rows)}"
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from the catalog version and the request variant"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of a compressed variant: each encoding is its own representation"""
+    if encoding is None or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def cache_control() -> str:
+    """Cache-Control value for cacheable public catalog responses"""
+    return (
+        f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, "
+        f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the validator headers"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,40 @@
+from typing import Optional
+from app.cache import invalidate_categories, invalidate_table
+from app.categories import category_indexes
+from app.search import search_indexes
+from app.snapshot import catalog_snapshot
+from app.shared_snapshot import shared_catalog
+from app.export import catalog_exporter
+
+
+def catalog_changed(
+    table: str,
+    old: Optional[dict] = None,
+    new: Optional[dict] = None,
+    reindex: bool = False
+) -> None:
+    """Propagate a write to the in-process catalog caches.
+
+    `old`/`new` are the row before and after the write (None for creates and
+    deletes respectively). Writes that cannot affect categories may omit both.
+    `reindex` is for writes that may have moved a row between categories
+    without its previous values being known.
+    """
+    if (old is None and new is None) or (reindex and (old is None or new is None)):
+        invalidate_table(table)
+    else:
+        # Only listings that can contain the row: unfiltered ones and its categories
+        invalidate_categories(table, {row.get("category") for row in (old, new) if row})
+    catalog_snapshot.invalidate()
+    shared_catalog.request_rebuild()
+    catalog_exporter.schedule()
+    if reindex:
+        category_indexes[table].invalidate()
+    else:
+        category_indexes[table].apply(old, new)
+    
+    # The search index replaces rows by id, so it only needs them when known
+    if old is not None or new is not None:
+        search_indexes[table].apply(old, new)
+    elif reindex:
+        search_indexes[table].invalidate()
@@ -0,0 +1,137 @@
+import asyncio
+from collections import deque
+from typing import List, Optional, Tuple
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.metrics import REQUESTS_SHED
+
+
+class ConcurrencyLimiter:
+    """At most `max_concurrent` requests at once, plus a bounded FIFO wait queue.
+
+    Requests that find the queue full, or wait longer than `queue_timeout`,
+    are rejected immediately instead of piling up behind the running ones.
+    A limit of 0 disables the limiter.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self) -> bool:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if waiter.done():
+            # release() handed its slot over to this request
+            return True
+        self._abandon(waiter)
+        return False
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot arrived just as the request gave up: pass it on
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+
+
+# (path prefix, limiter, rejection status), most specific prefix first.
+# Paths outside these prefixes (/, /health, /metrics) are never limited.
+LIMITED_PATHS: List[Tuple[str, ConcurrencyLimiter, int]] = [
+    (
+        "/api/admin/login",
+        ConcurrencyLimiter("login", settings.LOGIN_MAX_CONCURRENCY, settings.LOGIN_MAX_QUEUE, settings.LIMIT_QUEUE_TIMEOUT),
+        429,
+    ),
+    (
+        "/api/admin",
+        ConcurrencyLimiter("admin", settings.ADMIN_MAX_CONCURRENCY, settings.ADMIN_MAX_QUEUE, settings.LIMIT_QUEUE_TIMEOUT),
+        503,
+    ),
+    (
+        "/api/public",
+        ConcurrencyLimiter("public", settings.PUBLIC_MAX_CONCURRENCY, settings.PUBLIC_MAX_QUEUE, settings.LIMIT_QUEUE_TIMEOUT),
+        503,
+    ),
+]
+
+
+def limiter_for(path: str) -> Optional[Tuple[ConcurrencyLimiter, int]]:
+    for prefix, limiter, status_code in LIMITED_PATHS:
+        if path.startswith(prefix):
+            return (limiter, status_code) if limiter.max_concurrent > 0 else None
+    return None
+
+
+def limiter_stats() -> dict:
+    return {limiter.name: limiter.stats() for _, limiter, _ in LIMITED_PATHS}
+
+
+class LoadSheddingMiddleware:
+    """Apply the per-router concurrency limits, rejecting overflow with Retry-After.
+
+    Public, admin and login traffic have separate limiters, so a storefront
+    spike can only exhaust the public slots while admin routes and /health
+    keep answering.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter, status_code = match
+        if not await limiter.acquire():
+            REQUESTS_SHED.inc(limiter.name)
+            detail = "Too many login attempts" if status_code == 429 else "Server is busy, try again later"
+            response = JSONResponse(
+                status_code=status_code,
+                content={"detail": detail},
+                headers={"Retry-After": str(settings.LIMIT_RETRY_AFTER)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,185 @@
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Sequence, Tuple
+from fastapi import Response
+from app.profiling import current_profile
+
+# Latency buckets in seconds, tuned for in-process hits up to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions"""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+            label_text = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+REQUESTS_TOTAL = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status.",
+    ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method, route template and status.",
+    ("method", "route", "status")
+)
+REQUESTS_SHED = Counter(
+    "http_requests_shed_total", "Requests rejected by a concurrency limiter.", ("limiter",)
+)
+DB_CALLS_TOTAL = Counter(
+    "db_calls_total", "Upstream database calls by table, operation and outcome.",
+    ("table", "operation", "outcome")
+)
+DB_CALL_DURATION = Histogram(
+    "db_call_duration_seconds", "Upstream database call latency by table and operation.",
+    ("table", "operation")
+)
+UPSTREAM_CIRCUIT_OPEN = Gauge(
+    "upstream_circuit_open", "1 while the circuit breaker around upstream reads is open.", ("circuit",)
+)
+STALE_RESPONSES = Counter(
+    "stale_responses_total", "Responses served from last-known-good data while upstream failed.", ("route",)
+)
+
+REGISTRY = [
+    REQUESTS_TOTAL, REQUESTS_IN_FLIGHT, REQUEST_DURATION, REQUESTS_SHED, DB_CALLS_TOTAL, DB_CALL_DURATION,
+    UPSTREAM_CIRCUIT_OPEN, STALE_RESPONSES
+]
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response() -> Response:
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def timed_db_call(operation: str):
+    """Decorate a repository coroutine method to record its latency and outcome"""
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await method(self, *args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                DB_CALL_DURATION.observe(elapsed, self.table, operation)
+                DB_CALLS_TOTAL.inc(self.table, operation, outcome)
+                profile = current_profile.get()
+                if profile is not None:
+                    profile.add_upstream(elapsed)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, in-flight and latency per route template.
+
+    Labels use the matched route's path template (/api/public/products/{product_id})
+    rather than the raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"), str(status))
+            REQUEST_DURATION.observe(time.perf_counter() - started, *labels)
+            REQUESTS_TOTAL.inc(*labels)
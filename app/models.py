@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
 
@@ -36,6 +36,21 @@ class Product(ProductBase):
         from_attributes = True
 
 
+class ProductPartial(BaseModel):
+    """Product restricted to the fields requested with `fields=`"""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    stock: Optional[int] = None
+    image_url: Optional[str] = None
+    category: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    whatsapp_link: Optional[str] = None  # only with include_whatsapp=true
+
+
 class AdminLogin(BaseModel):
     username: str
     password: str
@@ -85,3 +100,47 @@ class Treatment(TreatmentBase):
 
     class Config:
         from_attributes = True
+
+
+class TreatmentPartial(BaseModel):
+    """Treatment restricted to the fields requested with `fields=`"""
+    id: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    duration: Optional[str] = None
+    currency: Optional[str] = None
+    stock: Optional[int] = None
+    image_url: Optional[str] = None
+    category: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    whatsapp_link: Optional[str] = None  # only with include_whatsapp=true
+
+
+# Bulk admin models
+class ProductBulkRequest(BaseModel):
+    create: List[Dict[str, Any]] = []  # validated one by one as ProductCreate
+    update: List[Dict[str, Any]] = []  # ProductUpdate fields plus "id"
+    delete: List[Any] = []  # ids, validated one by one
+
+
+class TreatmentBulkRequest(BaseModel):
+    create: List[Dict[str, Any]] = []  # validated one by one as TreatmentCreate
+    update: List[Dict[str, Any]] = []  # TreatmentUpdate fields plus "id"
+    delete: List[Any] = []  # ids, validated one by one
+
+
+class BulkItemResult(BaseModel):
+    op: str  # "create", "update" or "delete"
+    index: int  # position within its operation list
+    status: int  # HTTP-like status of the item
+    id: Optional[Union[int, str]] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Response
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque cursor pointing just after the given row"""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, object]:
+    """Decode a cursor into its (created_at, id) keyset position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """Pagination is opt-in: a cursor alone implies the default page size"""
+    if limit is None and cursor:
+        return settings.DEFAULT_PAGE_SIZE
+    return limit
+
+
+def keyset_position(cursor: Optional[str]) -> Optional[Tuple[str, object]]:
+    """Keyset position to continue from, or None for the first page"""
+    return decode_cursor(cursor) if cursor else None
+
+
+def split_page(rows: List[dict], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Trim the extra row fetched past the page and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,196 @@
+import cProfile
+import io
+import pstats
+import random
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.auth import verify_token
+from app.config import settings
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Functions whose cumulative time is attributed to a phase: (path suffix, name) -> phase
+PHASE_FUNCTIONS = {
+    ("fastapi/dependencies/utils.py", "request_body_to_args"): "validation",
+    ("fastapi/dependencies/utils.py", "request_params_to_args"): "validation",
+    ("fastapi/routing.py", "serialize_response"): "serialization",
+    ("starlette/responses.py", "render"): "serialization",
+    ("app/serialization.py", "encode_rows"): "serialization",
+    ("app/serialization.py", "dumps"): "serialization",
+    ("app/compression.py", "compress"): "compression",
+}
+PHASES = ("validation", "serialization", "compression")
+
+# Set only while a profiled request runs; read by timed repository calls
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+profiles = deque(maxlen=settings.PROFILE_MAX_STORED)
+
+# cProfile hooks the whole thread, so one profiled request runs at a time
+_profiler_busy = False
+
+
+class RequestProfile:
+    """Timing breakdown of one profiled request"""
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.upstream_io = 0.0
+        self.upstream_calls = 0
+        self.threaded = {phase: 0.0 for phase in PHASES}
+
+    def add_upstream(self, seconds: float) -> None:
+        self.upstream_io += seconds
+        self.upstream_calls += 1
+
+    def add_threaded(self, phase: str, seconds: float) -> None:
+        """Wall time of phase work run in a worker thread, which cProfile does not see"""
+        self.threaded[phase] += seconds
+
+    def finish(self, profiler: cProfile.Profile, route: Optional[str], status: int, elapsed: float) -> dict:
+        stats = pstats.Stats(profiler)
+        phases = dict(self.threaded)
+        for function, (_, _, _, cumulative, callers) in stats.stats.items():
+            phase = _phase(function)
+            if phase is None:
+                continue
+            # Time spent under another phase function (encode_rows -> dumps) is counted there
+            nested = sum(times[3] for caller, times in callers.items() if _phase(caller) is not None)
+            phases[phase] += max(cumulative - nested, 0.0)
+
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(settings.PROFILE_TOP_FUNCTIONS)
+
+        accounted = self.upstream_io + sum(phases.values())
+        return {
+            "id": self.id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "trigger": self.trigger,
+            "total_ms": round(elapsed * 1000, 3),
+            "phases_ms": {
+                "upstream_io": round(self.upstream_io * 1000, 3),
+                **{phase: round(phases[phase] * 1000, 3) for phase in PHASES},
+                "other": round(max(elapsed - accounted, 0.0) * 1000, 3),
+            },
+            "upstream_calls": self.upstream_calls,
+            "stack": stream.getvalue(),
+        }
+
+
+def _phase(function: tuple) -> Optional[str]:
+    filename, _, name = function
+    filename = filename.replace("\\", "/")
+    for (suffix, phase_name), phase in PHASE_FUNCTIONS.items():
+        if name == phase_name and filename.endswith(suffix):
+            return phase
+    return None
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    return next((profile for profile in profiles if profile["id"] == profile_id), None)
+
+
+def list_profiles() -> List[dict]:
+    """Stored profiles, newest first, without the call stacks"""
+    return [
+        {key: value for key, value in profile.items() if key != "stack"}
+        for profile in reversed(profiles)
+    ]
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_admin(scope) -> bool:
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=authorization[7:]))
+        return True
+    except HTTPException:
+        return False
+
+
+class ProfilingMiddleware:
+    """Profile a request when an admin sends the profiling header, or at the sample rate.
+
+    Untriggered requests only pay for the trigger check. Triggered requests run
+    under cProfile; upstream I/O is the wall time of the repository calls made
+    by the request, validation, serialization and compression are the
+    cumulative time of FastAPI's body/param validation, response and row
+    encoding, and compression (plus the wall time of compression handed to
+    worker threads). Profiles are kept in memory (see /api/admin/profiles)
+    and the response carries their id in X-Profile-Id. cProfile hooks the whole thread, so concurrent requests
+    interleaving with the profiled one also show up in its call stack.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILE_HEADER.lower().encode("latin-1")
+
+    def _trigger(self, scope) -> Optional[str]:
+        if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sample"
+        if _header(scope, self.header) and _is_admin(scope):
+            return "header"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _profiler_busy:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self._profile(scope, receive, send, trigger)
+
+    async def _profile(self, scope, receive, send, trigger: str):
+        global _profiler_busy
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode("latin-1"), profile.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        _profiler_busy = True
+        token = current_profile.set(profile)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            current_profile.reset(token)
+            _profiler_busy = False
+            route = getattr(scope.get("route"), "path", None)
+            profiles.append(profile.finish(profiler, route, status, elapsed))
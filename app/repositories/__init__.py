@@ -0,0 +1,6 @@
+# Repository layer: catalog data access behind a backend chosen in Settings
+from app.repositories.base import CatalogRepository, KeysetPosition
+from app.repositories.supabase_repo import SupabaseRepository
+from app.repositories.sqlite_repo import SQLiteRepository
+
+__all__ = ["CatalogRepository", "KeysetPosition", "SupabaseRepository", "SQLiteRepository"]
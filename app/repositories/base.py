@@ -0,0 +1,83 @@
+import inspect
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.metrics import timed_db_call
+from app.resilience import READ_OPERATIONS, guarded_read
+
+# (created_at, id) of the last row of the previous page
+KeysetPosition = Tuple[str, Any]
+
+
+class CatalogRepository(ABC):
+    """Data access for one catalog table (products or treatments).
+
+    Methods cover the query shapes the routers use. Every read returns plain
+    row dicts as PostgREST would: timestamps as ISO strings, ids as int
+    (products) or str (treatments).
+
+    Public coroutine methods of every implementation are timed per table and
+    operation (see app/metrics.py); reads also get the upstream timeout and
+    circuit breaker (see app/resilience.py).
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and name != "close" and inspect.iscoroutinefunction(method):
+                if name in READ_OPERATIONS:
+                    method = guarded_read(method)
+                setattr(cls, name, timed_db_call(name)(method))
+
+    def __init__(self, table: str):
+        self.table = table
+
+    @abstractmethod
+    async def list(
+        self,
+        *,
+        active_only: bool = False,
+        category: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[KeysetPosition] = None
+    ) -> List[dict]:
+        """Rows ordered by (created_at, id) descending, optionally after a keyset position"""
+
+    @abstractmethod
+    async def get(self, item_id: Any, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        """Single row by id, or None"""
+
+    @abstractmethod
+    async def get_many(self, ids: List[Any], columns: Optional[Sequence[str]] = None) -> List[dict]:
+        """Rows whose id is in `ids` (one query), in no particular order"""
+
+    @abstractmethod
+    async def insert(self, rows: List[dict]) -> List[dict]:
+        """Insert rows and return them as stored, in input order"""
+
+    @abstractmethod
+    async def update(self, item_id: Any, changes: dict) -> Optional[dict]:
+        """Apply a partial update and return the updated row, or None if missing"""
+
+    @abstractmethod
+    async def update_many(self, items: List[dict]) -> List[dict]:
+        """Apply partial updates given as {"id": ..., <fields>} and return the updated rows"""
+
+    @abstractmethod
+    async def toggle_active(self, item_id: Any) -> Optional[dict]:
+        """Atomically flip is_active and return the row, or None if missing"""
+
+    @abstractmethod
+    async def delete(self, item_id: Any) -> Optional[dict]:
+        """Delete a row and return it, or None if missing"""
+
+    @abstractmethod
+    async def delete_many(self, ids: List[Any]) -> List[dict]:
+        """Delete rows by id and return the ones that existed"""
+
+    @abstractmethod
+    async def category_counts(self) -> Dict[str, int]:
+        """Active item count per category"""
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,212 @@
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from app.repositories.base import CatalogRepository, KeysetPosition
+
+# Local mirror of database/schema.sql for offline runs, tests and benchmarks
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT,
+    price REAL NOT NULL CHECK (price > 0),
+    stock INTEGER NOT NULL DEFAULT 0 CHECK (stock >= 0),
+    image_url TEXT,
+    category TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_created_at_id ON products(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+
+CREATE TABLE IF NOT EXISTS treatments (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT,
+    price REAL NOT NULL CHECK (price > 0),
+    duration TEXT,
+    currency TEXT NOT NULL DEFAULT 'CRC',
+    stock INTEGER NOT NULL DEFAULT 999,
+    image_url TEXT,
+    category TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_treatments_created_at_id ON treatments(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_treatments_category ON treatments(category);
+"""
+
+COLUMNS = {
+    "products": (
+        "id", "name", "description", "price", "stock", "image_url",
+        "category", "is_active", "created_at", "updated_at"
+    ),
+    "treatments": (
+        "id", "name", "description", "price", "duration", "currency", "stock",
+        "image_url", "category", "is_active", "created_at", "updated_at"
+    ),
+}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the SQLite database and create the catalog tables"""
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _to_row(record: sqlite3.Row) -> dict:
+    row = dict(record)
+    if "is_active" in row:
+        row["is_active"] = bool(row["is_active"])
+    return row
+
+
+class SQLiteRepository(CatalogRepository):
+    """Catalog table in a local SQLite database (in-memory by default).
+
+    Queries are microseconds long, so they run inline on the event loop.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, table: str):
+        super().__init__(table)
+        self.connection = connection
+        self.columns = COLUMNS[table]
+
+    def _select(self, columns: Optional[Sequence[str]]) -> str:
+        if not columns:
+            return "*"
+        return ", ".join(column for column in columns if column in self.columns)
+
+    @contextmanager
+    def _transaction(self):
+        self.connection.execute("BEGIN")
+        try:
+            yield
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def _fetch(self, sql: str, params: Sequence = ()) -> List[dict]:
+        return [_to_row(record) for record in self.connection.execute(sql, params).fetchall()]
+
+    async def list(
+        self,
+        *,
+        active_only: bool = False,
+        category: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[KeysetPosition] = None
+    ) -> List[dict]:
+        sql = f"SELECT {self._select(columns)} FROM {self.table}"
+        conditions, params = [], []
+
+        if active_only:
+            conditions.append("is_active = 1")
+
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+
+        if after:
+            created_at, row_id = after
+            conditions.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params += [created_at, created_at, row_id]
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        sql += " ORDER BY created_at DESC, id DESC"
+
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return self._fetch(sql, params)
+
+    async def get(self, item_id: Any, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        rows = self._fetch(f"SELECT {self._select(columns)} FROM {self.table} WHERE id = ?", (item_id,))
+        return rows[0] if rows else None
+
+    async def get_many(self, ids: List[Any], columns: Optional[Sequence[str]] = None) -> List[dict]:
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        return self._fetch(
+            f"SELECT {self._select(columns)} FROM {self.table} WHERE id IN ({placeholders})",
+            list(ids)
+        )
+
+    async def insert(self, rows: List[dict]) -> List[dict]:
+        inserted = []
+        with self._transaction():
+            for row in rows:
+                row = {key: value for key, value in row.items() if key in self.columns}
+                if self.table == "treatments" and not row.get("id"):
+                    row["id"] = str(uuid.uuid4())
+                row.setdefault("created_at", _now())
+                row.setdefault("updated_at", row["created_at"])
+                names = ", ".join(row)
+                placeholders = ", ".join("?" for _ in row)
+                inserted += self._fetch(
+                    f"INSERT INTO {self.table} ({names}) VALUES ({placeholders}) RETURNING *",
+                    list(row.values())
+                )
+        return inserted
+
+    def _update_row(self, item_id: Any, changes: dict) -> Optional[dict]:
+        changes = {key: value for key, value in changes.items() if key in self.columns and key != "id"}
+        changes.setdefault("updated_at", _now())
+        assignments = ", ".join(f"{key} = ?" for key in changes)
+        rows = self._fetch(
+            f"UPDATE {self.table} SET {assignments} WHERE id = ? RETURNING *",
+            [*changes.values(), item_id]
+        )
+        return rows[0] if rows else None
+
+    async def update(self, item_id: Any, changes: dict) -> Optional[dict]:
+        return self._update_row(item_id, changes)
+
+    async def update_many(self, items: List[dict]) -> List[dict]:
+        updated = []
+        with self._transaction():
+            for item in items:
+                row = self._update_row(item["id"], item)
+                if row:
+                    updated.append(row)
+        return updated
+
+    async def toggle_active(self, item_id: Any) -> Optional[dict]:
+        rows = self._fetch(
+            f"UPDATE {self.table} SET is_active = NOT is_active, updated_at = ? WHERE id = ? RETURNING *",
+            (_now(), item_id)
+        )
+        return rows[0] if rows else None
+
+    async def delete(self, item_id: Any) -> Optional[dict]:
+        rows = self._fetch(f"DELETE FROM {self.table} WHERE id = ? RETURNING *", (item_id,))
+        return rows[0] if rows else None
+
+    async def delete_many(self, ids: List[Any]) -> List[dict]:
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        return self._fetch(f"DELETE FROM {self.table} WHERE id IN ({placeholders}) RETURNING *", list(ids))
+
+    async def category_counts(self) -> Dict[str, int]:
+        rows = self._fetch(
+            f"SELECT category, SUM(is_active) AS active_count FROM {self.table} "
+            "WHERE category IS NOT NULL GROUP BY category"
+        )
+        return {row["category"]: row["active_count"] for row in rows}
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional, Sequence
+from app.repositories.base import CatalogRepository, KeysetPosition
+
+
+class SupabaseRepository(CatalogRepository):
+    """Catalog table backed by Supabase/PostgREST (see database/schema.sql)"""
+
+    def __init__(self, client, table: str):
+        super().__init__(table)
+        self.client = client
+        singular = table[:-1]
+        self.toggle_function = f"toggle_{singular}_active"
+        self.bulk_update_function = f"bulk_update_{table}"
+        self.category_view = f"{singular}_category_counts"
+
+    async def list(
+        self,
+        *,
+        active_only: bool = False,
+        category: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        after: Optional[KeysetPosition] = None
+    ) -> List[dict]:
+        query = self.client.table(self.table).select(",".join(columns) if columns else "*")
+
+        if active_only:
+            query = query.eq("is_active", True)
+
+        if category:
+            query = query.eq("category", category)
+
+        query = query.order("created_at", desc=True).order("id", desc=True)
+
+        if after:
+            created_at, row_id = after
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+            )
+
+        if limit:
+            query = query.limit(limit)
+
+        response = await query.execute()
+        return response.data
+
+    async def get(self, item_id: Any, columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        response = await self.client.table(self.table).select(
+            ",".join(columns) if columns else "*"
+        ).eq("id", item_id).execute()
+        return response.data[0] if response.data else None
+
+    async def get_many(self, ids: List[Any], columns: Optional[Sequence[str]] = None) -> List[dict]:
+        if not ids:
+            return []
+        response = await self.client.table(self.table).select(
+            ",".join(columns) if columns else "*"
+        ).in_("id", list(ids)).execute()
+        return response.data
+
+    async def insert(self, rows: List[dict]) -> List[dict]:
+        response = await self.client.table(self.table).insert(rows).execute()
+        return response.data
+
+    async def update(self, item_id: Any, changes: dict) -> Optional[dict]:
+        response = await self.client.table(self.table).update(changes).eq("id", item_id).execute()
+        return response.data[0] if response.data else None
+
+    async def update_many(self, items: List[dict]) -> List[dict]:
+        response = await self.client.rpc(self.bulk_update_function, {"items": items}).execute()
+        return response.data
+
+    async def toggle_active(self, item_id: Any) -> Optional[dict]:
+        response = await self.client.rpc(self.toggle_function, {"p_id": item_id}).execute()
+        return response.data[0] if response.data else None
+
+    async def delete(self, item_id: Any) -> Optional[dict]:
+        response = await self.client.table(self.table).delete().eq("id", item_id).execute()
+        return response.data[0] if response.data else None
+
+    async def delete_many(self, ids: List[Any]) -> List[dict]:
+        response = await self.client.table(self.table).delete().in_("id", ids).execute()
+        return response.data
+
+    async def category_counts(self) -> Dict[str, int]:
+        response = await self.client.table(self.category_view).select("category,active_count").execute()
+        return {row["category"]: row["active_count"] for row in response.data}
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import math
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import httpx
+from fastapi import HTTPException, Request, Response
+from app.cache import TTLCache, table_generation
+from app.config import settings
+from app.metrics import STALE_RESPONSES, UPSTREAM_CIRCUIT_OPEN
+
+# Repository operations guarded by the timeout and the circuit breaker
+# (writes are left alone: a timed out write may still have been applied)
+READ_OPERATIONS = {"list", "get", "get_many", "category_counts"}
+
+# PostgREST error codes meaning the database itself is unreachable or overloaded
+UPSTREAM_ERROR_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014"}
+
+STALE_HEADER = "X-Cache-Stale"
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(HTTPException):
+    """Upstream read failed, timed out or was refused by the open circuit.
+
+    An HTTPException, so routers re-raise it as a 503 instead of wrapping it
+    into a 500 with the upstream error text.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=503,
+            detail=f"Catalog temporarily unavailable ({reason})",
+            headers={"Retry-After": str(math.ceil(settings.CIRCUIT_RESET_TIMEOUT))}
+        )
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Timeouts, connection errors and 5xx answers, not bad requests or missing rows"""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code >= 500
+    return code in UPSTREAM_ERROR_CODES
+
+
+class CircuitBreaker:
+    """Fails upstream reads fast after repeated failures.
+
+    Closed: calls go through, CIRCUIT_FAILURE_THRESHOLD consecutive failures
+    open it. Open: calls raise UpstreamUnavailable without reaching upstream.
+    After CIRCUIT_RESET_TIMEOUT seconds a single trial call is let through;
+    its success closes the circuit, its failure opens it for another period.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.CIRCUIT_RESET_TIMEOUT:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise while open; True when this call is the half-open trial"""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        raise UpstreamUnavailable("circuit open")
+
+    def release_trial(self) -> None:
+        """A cancelled trial call proves nothing: let the next call try instead"""
+        self._trial = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial = False
+        if self.opened_at is not None:
+            self.opened_at = None
+            UPSTREAM_CIRCUIT_OPEN.set(0, self.name)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            self.opened_at = time.monotonic()
+            UPSTREAM_CIRCUIT_OPEN.set(1, self.name)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "state": self.state, "consecutive_failures": self.failures}
+
+
+upstream_breaker = CircuitBreaker("upstream")
+
+
+def guarded_read(method):
+    """Decorate a repository read with the upstream timeout and circuit breaker"""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        trial = upstream_breaker.before_call()
+        try:
+            result = await asyncio.wait_for(method(self, *args, **kwargs), settings.UPSTREAM_TIMEOUT or None)
+        except asyncio.CancelledError:
+            if trial:
+                upstream_breaker.release_trial()
+            raise
+        except Exception as e:
+            if not is_upstream_failure(e):
+                upstream_breaker.record_success()
+                raise
+            upstream_breaker.record_failure()
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "upstream error"
+            raise UpstreamUnavailable(reason) from e
+        upstream_breaker.record_success()
+        return result
+    return wrapper
+
+
+# Last successfully fetched value per cache key, kept long after the regular
+# TTL so listings can still be served while upstream is down
+last_known_good = TTLCache(max_entries=settings.CATALOG_CACHE_MAX_ENTRIES, ttl=settings.STALE_MAX_AGE)
+_refreshing: Dict[Hashable, asyncio.Task] = {}
+
+
+async def cached_fetch(cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+    """(value, stale) for a cache key: cached, freshly fetched, or last known good.
+
+    The stale value is only used when the fetch fails with UpstreamUnavailable.
+    A single background refresh per key then retries every
+    STALE_REFRESH_INTERVAL seconds, and until it succeeds requests for that
+    key get the stale value right away instead of waiting on upstream.
+
+    Keys start with the table name: a value fetched while that table was
+    invalidated is returned but not stored, it may predate the write.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value, False
+
+    if key in _refreshing:
+        fallback = last_known_good.get(key)
+        if fallback is not None:
+            return fallback, True
+
+    generation = table_generation(key[0])
+    try:
+        value = await fetch()
+    except UpstreamUnavailable:
+        fallback = last_known_good.get(key)
+        if fallback is None:
+            raise
+        _refresh_in_background(cache, key, fetch)
+        return fallback, True
+
+    _store(cache, key, value, generation)
+    return value, False
+
+
+def _store(cache: TTLCache, key: Hashable, value: Any, generation: int) -> bool:
+    """Cache a fetched value unless its table was invalidated during the fetch"""
+    if table_generation(key[0]) != generation:
+        return False
+    cache.set(key, value)
+    last_known_good.set(key, value)
+    return True
+
+
+def _refresh_in_background(cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+    if key not in _refreshing:
+        _refreshing[key] = asyncio.get_running_loop().create_task(_refresh(cache, key, fetch))
+
+
+async def _refresh(cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+    deadline = time.monotonic() + settings.STALE_MAX_AGE
+    try:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.STALE_REFRESH_INTERVAL)
+            generation = table_generation(key[0])
+            try:
+                value = await fetch()
+            except UpstreamUnavailable:
+                continue
+            except Exception:
+                logger.exception("Background refresh of %s failed", key)
+                return
+            if _store(cache, key, value, generation):
+                return
+    finally:
+        _refreshing.pop(key, None)
+
+
+def mark_stale(request: Request, response: Response) -> None:
+    """Flag a last-known-good response so clients and CDNs revalidate it soon"""
+    route = request.scope.get("route")
+    STALE_RESPONSES.inc(route.path if route is not None else "unmatched")
+    response.headers[STALE_HEADER] = "1"
+    response.headers["Cache-Control"] = "no-cache"
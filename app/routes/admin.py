@@ -1,22 +1,54 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import List, Optional
+from app.database import get_repository
+from app.cache import catalog_cache
+from app.invalidation import catalog_changed
+from app.bulk import run_bulk
+from app.fields import parse_fields, select_columns, project
+from app.serialization import encode_rows, json_response
+from app.pagination import page_size, keyset_position, split_page, set_next_cursor
+from app.config import settings
+from app.profiling import get_profile, list_profiles
+from app.limits import limiter_stats
+from app.resilience import upstream_breaker
 from app.models import (
     Product, 
+    ProductPartial,
     ProductCreate, 
     ProductUpdate,
     Treatment,
     TreatmentCreate,
     TreatmentUpdate,
+    TreatmentPartial,
+    ProductBulkRequest,
+    TreatmentBulkRequest,
+    BulkResponse,
     AdminLogin, 
     AdminToken
 )
-from app.auth import verify_admin, create_access_token, verify_token
+from app.auth import verify_admin, create_access_token, verify_token, token_cache
 from datetime import datetime
 
 router = APIRouter()
 
 
+async def _bulk(table: str, request, create_model, update_model, create_defaults: dict) -> dict:
+    """Run a bulk request and invalidate the catalog caches once for the batch"""
+    total = len(request.create) + len(request.update) + len(request.delete)
+    if total > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk requests are limited to {settings.BULK_MAX_ITEMS} items"
+        )
+    
+    results = await run_bulk(get_repository(table), request, create_model, update_model, create_defaults)
+    succeeded = sum(1 for result in results if result.status < 400)
+    if succeeded:
+        catalog_changed(table, reindex=True)
+    
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
 @router.post("/login", response_model=AdminToken)
 async def admin_login(credentials: AdminLogin):
     """Admin login endpoint"""
@@ -30,13 +62,70 @@ async def admin_login(credentials: AdminLogin):
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@router.get("/products", response_model=List[Product])
-async def get_all_products(token: dict = Depends(verify_token)):
+@router.get("/cache/stats")
+async def get_cache_stats(token: dict = Depends(verify_token)):
+    """Get catalog cache hit/miss counters (admin only)"""
+    return catalog_cache.stats()
+
+
+@router.get("/cache/token-stats")
+async def get_token_cache_stats(token: dict = Depends(verify_token)):
+    """Get verified-token cache hit/miss counters (admin only)"""
+    return token_cache.stats()
+
+
+@router.get("/limits")
+async def get_limits(token: dict = Depends(verify_token)):
+    """Get active and queued requests per concurrency limiter (admin only)"""
+    return limiter_stats()
+
+
+@router.get("/upstream")
+async def get_upstream_status(token: dict = Depends(verify_token)):
+    """Get the circuit breaker state of upstream reads (admin only)"""
+    return upstream_breaker.stats()
+
+
+@router.get("/profiles")
+async def get_profiles(token: dict = Depends(verify_token)):
+    """Get stored request profiles, newest first (admin only)"""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile_detail(profile_id: str, token: dict = Depends(verify_token)):
+    """Get a request profile with its call stack (admin only)"""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/products", response_model=List[ProductPartial], response_model_exclude_unset=True)
+async def get_all_products(
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    token: dict = Depends(verify_token)
+):
     """Get all products including inactive ones (admin only)"""
     try:
-        db = get_db()
-        response = db.table("products").select("*").order("created_at", desc=True).execute()
-        return response.data
+        limit = page_size(limit, cursor)
+        selected = parse_fields(fields, Product)
+        rows = await get_repository("products").list(
+            columns=select_columns(selected),
+            limit=limit + 1 if limit else None,
+            after=keyset_position(cursor)
+        )
+        next_cursor = None
+        if limit:
+            rows, next_cursor = split_page(rows, limit)
+        
+        response = json_response(encode_rows(project(rows, selected), ProductPartial))
+        set_next_cursor(response, next_cursor)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
 
@@ -45,22 +134,32 @@ async def get_all_products(token: dict = Depends(verify_token)):
 async def create_product(product: ProductCreate, token: dict = Depends(verify_token)):
     """Create a new product (admin only)"""
     try:
-        db = get_db()
-        
         product_data = product.model_dump()
         product_data["created_at"] = datetime.utcnow().isoformat()
         product_data["updated_at"] = datetime.utcnow().isoformat()
         
-        response = db.table("products").insert(product_data).execute()
+        created = await get_repository("products").insert([product_data])
         
-        if not response.data:
+        if not created:
             raise HTTPException(status_code=500, detail="Failed to create product")
         
-        return response.data[0]
+        catalog_changed("products", new=created[0])
+        return created[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating product: {str(e)}")
 
 
+@router.post("/products/bulk", response_model=BulkResponse)
+async def bulk_products(request: ProductBulkRequest, token: dict = Depends(verify_token)):
+    """Create, update and delete many products in one call (admin only)"""
+    try:
+        return await _bulk("products", request, ProductCreate, ProductUpdate, {})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in bulk product operation: {str(e)}")
+
+
 @router.put("/products/{product_id}", response_model=Product)
 async def update_product(
     product_id: int, 
@@ -69,26 +168,28 @@ async def update_product(
 ):
     """Update a product (admin only)"""
     try:
-        db = get_db()
-        
-        # Check if product exists
-        check_response = db.table("products").select("*").eq("id", product_id).execute()
-        if not check_response.data:
-            raise HTTPException(status_code=404, detail="Product not found")
+        repository = get_repository("products")
         
         # Update only provided fields
         update_data = {k: v for k, v in product.model_dump(exclude_unset=True).items()}
         
-        if update_data:
-            update_data["updated_at"] = datetime.utcnow().isoformat()
-            response = db.table("products").update(update_data).eq("id", product_id).execute()
-            
-            if not response.data:
-                raise HTTPException(status_code=500, detail="Failed to update product")
-            
-            return response.data[0]
+        if not update_data:
+            row = await repository.get(product_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail="Product not found")
+            return row
         
-        return check_response.data[0]
+        # Conditional update returning the row: no match means the product does not exist
+        update_data["updated_at"] = datetime.utcnow().isoformat()
+        row = await repository.update(product_id, update_data)
+        
+        if row is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        
+        # A row that kept its category and status is its own previous version
+        moved = bool(update_data.keys() & {"category", "is_active"})
+        catalog_changed("products", old=None if moved else row, new=row, reindex=moved)
+        return row
     except HTTPException:
         raise
     except Exception as e:
@@ -99,14 +200,12 @@ async def update_product(
 async def delete_product(product_id: int, token: dict = Depends(verify_token)):
     """Delete a product (admin only)"""
     try:
-        db = get_db()
-        
-        # Check if product exists
-        check_response = db.table("products").select("*").eq("id", product_id).execute()
-        if not check_response.data:
+        # Delete returns the removed row: none means the product does not exist
+        deleted = await get_repository("products").delete(product_id)
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        db.table("products").delete().eq("id", product_id).execute()
+        catalog_changed("products", old=deleted)
         return None
     except HTTPException:
         raise
@@ -118,22 +217,13 @@ async def delete_product(product_id: int, token: dict = Depends(verify_token)):
 async def toggle_product_active(product_id: int, token: dict = Depends(verify_token)):
     """Toggle product active status (admin only)"""
     try:
-        db = get_db()
-        
-        # Get current status
-        response = db.table("products").select("*").eq("id", product_id).execute()
-        if not response.data:
+        # Flip is_active atomically in the database (see database/schema.sql)
+        toggled = await get_repository("products").toggle_active(product_id)
+        if toggled is None:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        current_status = response.data[0]["is_active"]
-        
-        # Toggle status
-        update_response = db.table("products").update({
-            "is_active": not current_status,
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", product_id).execute()
-        
-        return update_response.data[0]
+        catalog_changed("products", old={**toggled, "is_active": not toggled["is_active"]}, new=toggled)
+        return toggled
     except HTTPException:
         raise
     except Exception as e:
@@ -151,17 +241,16 @@ async def update_stock(
         if new_stock < 0:
             raise HTTPException(status_code=400, detail="Stock cannot be negative")
         
-        db = get_db()
-        
-        response = db.table("products").update({
+        row = await get_repository("products").update(product_id, {
             "stock": new_stock,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", product_id).execute()
+        })
         
-        if not response.data:
+        if row is None:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        return response.data[0]
+        catalog_changed("products")
+        return row
     except HTTPException:
         raise
     except Exception as e:
@@ -170,13 +259,31 @@ async def update_stock(
 
 # ============= TREATMENTS ADMIN ENDPOINTS =============
 
-@router.get("/treatments")
-async def get_all_treatments(token: dict = Depends(verify_token)):
+@router.get("/treatments", response_model=List[TreatmentPartial], response_model_exclude_unset=True)
+async def get_all_treatments(
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    token: dict = Depends(verify_token)
+):
     """Get all treatments including inactive ones (admin only)"""
     try:
-        db = get_db()
-        response = db.table("treatments").select("*").order("created_at", desc=True).execute()
-        return response.data
+        limit = page_size(limit, cursor)
+        selected = parse_fields(fields, Treatment)
+        rows = await get_repository("treatments").list(
+            columns=select_columns(selected),
+            limit=limit + 1 if limit else None,
+            after=keyset_position(cursor)
+        )
+        next_cursor = None
+        if limit:
+            rows, next_cursor = split_page(rows, limit)
+        
+        response = json_response(encode_rows(project(rows, selected), TreatmentPartial))
+        set_next_cursor(response, next_cursor)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching treatments: {str(e)}")
 
@@ -185,23 +292,34 @@ async def get_all_treatments(token: dict = Depends(verify_token)):
 async def create_treatment(treatment: TreatmentCreate, token: dict = Depends(verify_token)):
     """Create a new treatment (admin only)"""
     try:
-        db = get_db()
-        
         treatment_data = treatment.model_dump()
         treatment_data["stock"] = 999  # Tratamientos siempre disponibles
         treatment_data["created_at"] = datetime.utcnow().isoformat()
         treatment_data["updated_at"] = datetime.utcnow().isoformat()
         
-        response = db.table("treatments").insert(treatment_data).execute()
+        created = await get_repository("treatments").insert([treatment_data])
         
-        if not response.data:
+        if not created:
             raise HTTPException(status_code=500, detail="Failed to create treatment")
         
-        return response.data[0]
+        catalog_changed("treatments", new=created[0])
+        return created[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating treatment: {str(e)}")
 
 
+@router.post("/treatments/bulk", response_model=BulkResponse)
+async def bulk_treatments(request: TreatmentBulkRequest, token: dict = Depends(verify_token)):
+    """Create, update and delete many treatments in one call (admin only)"""
+    try:
+        # Tratamientos siempre disponibles
+        return await _bulk("treatments", request, TreatmentCreate, TreatmentUpdate, {"stock": 999})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in bulk treatment operation: {str(e)}")
+
+
 @router.put("/treatments/{treatment_id}")
 async def update_treatment(
     treatment_id: str, 
@@ -210,26 +328,28 @@ async def update_treatment(
 ):
     """Update a treatment (admin only)"""
     try:
-        db = get_db()
-        
-        # Check if treatment exists
-        check_response = db.table("treatments").select("*").eq("id", treatment_id).execute()
-        if not check_response.data:
-            raise HTTPException(status_code=404, detail="Treatment not found")
+        repository = get_repository("treatments")
         
         # Update only provided fields
         update_data = {k: v for k, v in treatment.model_dump(exclude_unset=True).items()}
         
-        if update_data:
-            update_data["updated_at"] = datetime.utcnow().isoformat()
-            response = db.table("treatments").update(update_data).eq("id", treatment_id).execute()
-            
-            if not response.data:
-                raise HTTPException(status_code=500, detail="Failed to update treatment")
-            
-            return response.data[0]
+        if not update_data:
+            row = await repository.get(treatment_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail="Treatment not found")
+            return row
         
-        return check_response.data[0]
+        # Conditional update returning the row: no match means the treatment does not exist
+        update_data["updated_at"] = datetime.utcnow().isoformat()
+        row = await repository.update(treatment_id, update_data)
+        
+        if row is None:
+            raise HTTPException(status_code=404, detail="Treatment not found")
+        
+        # A row that kept its category and status is its own previous version
+        moved = bool(update_data.keys() & {"category", "is_active"})
+        catalog_changed("treatments", old=None if moved else row, new=row, reindex=moved)
+        return row
     except HTTPException:
         raise
     except Exception as e:
@@ -240,14 +360,12 @@ async def update_treatment(
 async def delete_treatment(treatment_id: str, token: dict = Depends(verify_token)):
     """Delete a treatment (admin only)"""
     try:
-        db = get_db()
-        
-        # Check if treatment exists
-        check_response = db.table("treatments").select("*").eq("id", treatment_id).execute()
-        if not check_response.data:
+        # Delete returns the removed row: none means the treatment does not exist
+        deleted = await get_repository("treatments").delete(treatment_id)
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Treatment not found")
         
-        db.table("treatments").delete().eq("id", treatment_id).execute()
+        catalog_changed("treatments", old=deleted)
         return None
     except HTTPException:
         raise
@@ -259,22 +377,13 @@ async def delete_treatment(treatment_id: str, token: dict = Depends(verify_token
 async def toggle_treatment_active(treatment_id: str, token: dict = Depends(verify_token)):
     """Toggle treatment active status (admin only)"""
     try:
-        db = get_db()
-        
-        # Get current status
-        response = db.table("treatments").select("*").eq("id", treatment_id).execute()
-        if not response.data:
+        # Flip is_active atomically in the database (see database/schema.sql)
+        toggled = await get_repository("treatments").toggle_active(treatment_id)
+        if toggled is None:
             raise HTTPException(status_code=404, detail="Treatment not found")
         
-        current_status = response.data[0]["is_active"]
-        
-        # Toggle status
-        update_response = db.table("treatments").update({
-            "is_active": not current_status,
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", treatment_id).execute()
-        
-        return update_response.data[0]
+        catalog_changed("treatments", old={**toggled, "is_active": not toggled["is_active"]}, new=toggled)
+        return toggled
     except HTTPException:
         raise
     except Exception as e:
@@ -1,48 +1,201 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from app.database import get_db
-from app.models import Product, Treatment
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, ValidationError
+from typing import List, Literal, Optional, Tuple, Type
+from app.database import get_repository
+from app.bulk import parse_id
+from app.cache import catalog_cache
+from app.categories import category_indexes
+from app.search import search_indexes
+from app.snapshot import catalog_snapshot
+from app.shared_snapshot import shared_catalog
+from app.pagination import page_size, keyset_position, split_page, set_next_cursor
+from app.http_cache import catalog_version, make_etag, encoded_etag, etag_matches, set_cache_headers, not_modified
+from app.fields import parse_fields, select_columns, project
+from app.compression import EncodedPayload, negotiate, payload_response
+from app.resilience import UpstreamUnavailable, cached_fetch, mark_stale
+from app.serialization import encode_rows
+from app.whatsapp import LINK_FIELDS, link_for
+from app.models import Product, ProductPartial, Treatment, TreatmentPartial
 from app.config import settings
-import urllib.parse
 
 router = APIRouter()
 
+MISSING_IDS_HEADER = "X-Missing-Ids"
 
-@router.get("/products", response_model=List[Product])
+
+def _parse_ids(raw: Optional[str], table: str) -> Tuple[list, list]:
+    """(ids, invalid) from a comma separated id list, dropping duplicates but keeping order.
+
+    Ids are cast to the table's id column type; the ones that do not cast
+    are returned apart (as sent) instead of failing the whole query upstream.
+    """
+    if not raw:
+        return [], []
+    parts = list(dict.fromkeys(part.strip() for part in raw.split(",") if part.strip()))
+    if len(parts) > settings.MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {settings.MAX_PAGE_SIZE} ids per request")
+    ids, invalid = [], []
+    for part in parts:
+        try:
+            ids.append(parse_id(table, part))
+        except ValidationError:
+            invalid.append(part)
+    return list(dict.fromkeys(ids)), invalid
+
+
+async def _fetch_listing(
+    table: str,
+    model: Type[BaseModel],
+    category: Optional[str],
+    active_only: bool,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[tuple] = None,
+    include_whatsapp: bool = False
+) -> tuple:
+    """Query a public listing (optionally one keyset page), serialize it once and compute its ETag"""
+    rows = await get_repository(table).list(
+        active_only=active_only,
+        category=category or None,
+        columns=_columns(table, fields, include_whatsapp),
+        limit=limit + 1 if limit else None,
+        after=keyset_position(cursor)
+    )
+    next_cursor = None
+    if limit:
+        rows, next_cursor = split_page(rows, limit)
+    
+    etag = make_etag(table, category, active_only, limit, cursor, fields, include_whatsapp, catalog_version(rows))
+    return EncodedPayload(encode_rows(_items(table, rows, fields, include_whatsapp), model)), etag, next_cursor
+
+
+def _columns(table: str, fields: Optional[tuple], include_whatsapp: bool, extra: tuple = ()) -> Optional[tuple]:
+    """Columns to fetch for a listing, including the ones needed for WhatsApp links"""
+    columns = select_columns(fields)
+    if columns is None:
+        return None
+    return tuple(sorted(set(columns) | set(extra) | (set(LINK_FIELDS[table]) if include_whatsapp else set())))
+
+
+def _items(table: str, rows: List[dict], fields: Optional[tuple], include_whatsapp: bool) -> List[dict]:
+    """Project rows to the requested fields and add WhatsApp links if asked"""
+    items = project(rows, fields)
+    if include_whatsapp:
+        items = [{**item, "whatsapp_link": link_for(table, row)} for item, row in zip(items, rows)]
+    return items
+
+
+async def _ids_response(
+    request: Request,
+    table: str,
+    model: Type[BaseModel],
+    raw_ids: str,
+    active_only: bool,
+    fields: Optional[tuple],
+    include_whatsapp: bool
+) -> Response:
+    """Items in the caller's order from one get_many query; missing and invalid ids go in X-Missing-Ids"""
+    ids, invalid = _parse_ids(raw_ids, table)
+    rows = await get_repository(table).get_many(
+        ids, columns=_columns(table, fields, include_whatsapp, extra=("is_active",))
+    ) if ids else []
+    by_id = {row["id"]: row for row in rows if row["is_active"] or not active_only}
+    ordered = [by_id[item_id] for item_id in ids if item_id in by_id]
+    missing = [str(item_id) for item_id in ids if item_id not in by_id] + invalid
+    
+    etag = make_etag(table, "ids", *ids, active_only, fields, include_whatsapp, catalog_version(ordered))
+    payload = EncodedPayload(encode_rows(_items(table, ordered, fields, include_whatsapp), model), fast=True)
+    response = await _listing_response(request, (payload, etag, None))
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(missing)
+    return response
+
+
+async def _listing_response(request: Request, cached: tuple, stale: bool = False) -> Response:
+    """304 or the cached payload, compressed variants reused per catalog version"""
+    payload, etag, next_cursor = cached
+    etag = encoded_etag(etag, payload.served_encoding(negotiate(request.headers.get("accept-encoding"))))
+    if etag_matches(request, etag):
+        response = not_modified(etag)
+    else:
+        response = await payload_response(request, payload)
+        set_cache_headers(response, etag)
+        set_next_cursor(response, next_cursor)
+    if stale:
+        mark_stale(request, response)
+    return response
+
+
+@router.get("/catalog")
+async def get_catalog(request: Request):
+    """Get all active products and treatments with their categories in one response"""
+    try:
+        if shared_catalog.enabled:
+            shared = await shared_catalog.get(lambda: catalog_snapshot.build(get_repository))
+            if shared is not None:
+                return await _listing_response(request, (shared, shared.etag, None))
+        
+        payload, etag = await catalog_snapshot.get(get_repository)
+        return await _listing_response(request, (payload, etag, None))
+    except UpstreamUnavailable:
+        # Last built snapshot, shared or local, while upstream is down
+        shared = shared_catalog.current() if shared_catalog.enabled else None
+        if shared is not None:
+            return await _listing_response(request, (shared, shared.etag, None), stale=True)
+        if catalog_snapshot.payload is not None:
+            return await _listing_response(request, (catalog_snapshot.payload, catalog_snapshot.etag, None), stale=True)
+        raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching catalog: {str(e)}")
+
+
+@router.get("/products", response_model=List[ProductPartial], response_model_exclude_unset=True)
 async def get_products(
+    request: Request,
     category: Optional[str] = None,
-    active_only: bool = True
+    active_only: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    include_whatsapp: bool = Query(False, description="Add each item's WhatsApp inquiry link"),
+    ids: Optional[str] = Query(None, description="Comma separated ids to fetch in this order (ignores paging)")
 ):
     """Get all active products (public endpoint)"""
     try:
-        db = get_db()
-        query = db.table("products").select("*")
+        limit = page_size(limit, cursor)
+        selected = parse_fields(fields, Product)
+        if ids:
+            return await _ids_response(request, "products", ProductPartial, ids, active_only, selected, include_whatsapp)
         
-        if active_only:
-            query = query.eq("is_active", True)
+        category = category or None  # "?category=" is the unfiltered listing
+        cache_key = ("products", category, active_only, limit, cursor, selected, include_whatsapp)
+        cached, stale = await cached_fetch(catalog_cache, cache_key, lambda: _fetch_listing(
+            "products", ProductPartial, category, active_only, limit, cursor, selected, include_whatsapp
+        ))
         
-        if category:
-            query = query.eq("category", category)
-        
-        query = query.order("created_at", desc=True)
-        
-        response = query.execute()
-        return response.data
+        return await _listing_response(request, cached, stale)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
 
 
-@router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: int):
+@router.get("/products/{product_id}", response_model=ProductPartial, response_model_exclude_unset=True)
+async def get_product(
+    product_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return")
+):
     """Get a single product by ID"""
     try:
-        db = get_db()
-        response = db.table("products").select("*").eq("id", product_id).execute()
+        selected = parse_fields(fields, Product)
+        row = await get_repository("products").get(product_id, columns=select_columns(selected))
         
-        if not response.data:
+        if row is None:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        return response.data[0]
+        return project([row], selected)[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -50,14 +203,16 @@ async def get_product(product_id: int):
 
 
 @router.get("/categories")
-async def get_categories():
-    """Get all unique product categories"""
+async def get_categories(request: Request, response: Response):
+    """Get product categories with active products, sorted by name"""
     try:
-        db = get_db()
-        response = db.table("products").select("category").execute()
-        
-        categories = list(set([item["category"] for item in response.data if item.get("category")]))
-        return {"categories": categories}
+        index = category_indexes["products"]
+        categories = await index.snapshot(get_repository("products"))
+        if index.stale:
+            mark_stale(request, response)
+        return categories
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
@@ -66,20 +221,13 @@ async def get_categories():
 async def get_whatsapp_link(product_id: int):
     """Generate WhatsApp link for product inquiry"""
     try:
-        db = get_db()
-        response = db.table("products").select("*").eq("id", product_id).execute()
+        product = await get_repository("products").get(product_id, columns=LINK_FIELDS["products"])
         
-        if not response.data:
+        if product is None:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        product = response.data[0]
-        message = f"Hola! Me interesa el producto: *{product['name']}*\nPrecio: ₡{product['price']:,.0f}"
-        
-        encoded_message = urllib.parse.quote(message)
-        whatsapp_link = f"https://wa.me/{settings.WHATSAPP_NUMBER.replace('+', '')}?text={encoded_message}"
-        
         return {
-            "whatsapp_link": whatsapp_link,
+            "whatsapp_link": link_for("products", product),
             "product_name": product['name'],
             "phone_number": settings.WHATSAPP_NUMBER
         }
@@ -89,56 +237,126 @@ async def get_whatsapp_link(product_id: int):
         raise HTTPException(status_code=500, detail=f"Error generating WhatsApp link: {str(e)}")
 
 
+@router.get("/whatsapp-links")
+async def get_whatsapp_links(
+    products: Optional[str] = Query(None, description="Comma separated product ids"),
+    treatments: Optional[str] = Query(None, description="Comma separated treatment ids")
+):
+    """Generate WhatsApp links for many products and treatments at once"""
+    try:
+        requested = {"products": products, "treatments": treatments}
+        links, missing = [], {}
+        for table, raw_ids in requested.items():
+            ids, invalid = _parse_ids(raw_ids, table)
+            rows = await get_repository(table).get_many(ids, columns=LINK_FIELDS[table]) if ids else []
+            by_id = {row["id"]: row for row in rows}
+            for item_id in ids:
+                row = by_id.get(item_id)
+                if row is not None:
+                    links.append({
+                        "type": table[:-1],
+                        "id": item_id,
+                        "name": row["name"],
+                        "whatsapp_link": link_for(table, row)
+                    })
+            missing[table] = [item_id for item_id in ids if item_id not in by_id] + invalid
+        
+        return {"links": links, "missing": missing, "phone_number": settings.WHATSAPP_NUMBER}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating WhatsApp links: {str(e)}")
+
+
+@router.get("/search")
+async def search_catalog(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: Literal["all", "products", "treatments"] = Query("all", alias="type"),
+    limit: int = Query(20, ge=1, le=settings.MAX_PAGE_SIZE)
+):
+    """Search active products and treatments by name, description and category"""
+    try:
+        tables = ("products", "treatments") if kind == "all" else (kind,)
+        results, stale = [], False
+        for table in tables:
+            matches = await search_indexes[table].search(get_repository(table), q, limit)
+            results += [{"type": table[:-1], **match} for match in matches]
+            stale = stale or search_indexes[table].stale
+        
+        if stale:
+            mark_stale(request, response)
+        results.sort(key=lambda result: -result["score"])
+        return {"query": q, "results": results[:limit]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching catalog: {str(e)}")
+
+
 # ============= TREATMENTS ENDPOINTS =============
 
-@router.get("/treatments")
+@router.get("/treatments", response_model=List[TreatmentPartial], response_model_exclude_unset=True)
 async def get_treatments(
+    request: Request,
     category: Optional[str] = None,
-    active_only: bool = True
+    active_only: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    include_whatsapp: bool = Query(False, description="Add each item's WhatsApp inquiry link"),
+    ids: Optional[str] = Query(None, description="Comma separated ids to fetch in this order (ignores paging)")
 ):
     """Get all active treatments (public endpoint)"""
     try:
-        db = get_db()
-        query = db.table("treatments").select("*")
+        limit = page_size(limit, cursor)
+        selected = parse_fields(fields, Treatment)
+        if ids:
+            return await _ids_response(request, "treatments", TreatmentPartial, ids, active_only, selected, include_whatsapp)
         
-        if active_only:
-            query = query.eq("is_active", True)
+        category = category or None  # "?category=" is the unfiltered listing
+        cache_key = ("treatments", category, active_only, limit, cursor, selected, include_whatsapp)
+        cached, stale = await cached_fetch(catalog_cache, cache_key, lambda: _fetch_listing(
+            "treatments", TreatmentPartial, category, active_only, limit, cursor, selected, include_whatsapp
+        ))
         
-        if category:
-            query = query.eq("category", category)
-        
-        query = query.order("created_at", desc=True)
-        
-        response = query.execute()
-        return response.data
+        return await _listing_response(request, cached, stale)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching treatments: {str(e)}")
 
 
 @router.get("/treatments/categories")
-async def get_treatment_categories():
-    """Get all unique treatment categories"""
+async def get_treatment_categories(request: Request, response: Response):
+    """Get treatment categories with active treatments, sorted by name"""
     try:
-        db = get_db()
-        response = db.table("treatments").select("category").execute()
-        
-        categories = list(set([item["category"] for item in response.data if item.get("category")]))
-        return {"categories": categories}
+        index = category_indexes["treatments"]
+        categories = await index.snapshot(get_repository("treatments"))
+        if index.stale:
+            mark_stale(request, response)
+        return categories
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching treatment categories: {str(e)}")
 
 
-@router.get("/treatments/{treatment_id}")
-async def get_treatment(treatment_id: str):
+@router.get("/treatments/{treatment_id}", response_model=TreatmentPartial, response_model_exclude_unset=True)
+async def get_treatment(
+    treatment_id: str,
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return")
+):
     """Get a single treatment by ID"""
     try:
-        db = get_db()
-        response = db.table("treatments").select("*").eq("id", treatment_id).execute()
+        selected = parse_fields(fields, Treatment)
+        row = await get_repository("treatments").get(treatment_id, columns=select_columns(selected))
         
-        if not response.data:
+        if row is None:
             raise HTTPException(status_code=404, detail="Treatment not found")
         
-        return response.data[0]
+        return project([row], selected)[0]
     except HTTPException:
         raise
     except Exception as e:
@@ -149,20 +367,13 @@ async def get_treatment(treatment_id: str):
 async def get_whatsapp_treatment_link(treatment_id: str):
     """Generate WhatsApp link for treatment reservation"""
     try:
-        db = get_db()
-        response = db.table("treatments").select("*").eq("id", treatment_id).execute()
+        treatment = await get_repository("treatments").get(treatment_id, columns=LINK_FIELDS["treatments"])
         
-        if not response.data:
+        if treatment is None:
             raise HTTPException(status_code=404, detail="Treatment not found")
         
-        treatment = response.data[0]
-        message = f"Hola! Me interesa reservar: *{treatment['name']}*\nPrecio: ₡{treatment['price']:,.0f}"
-        
-        encoded_message = urllib.parse.quote(message)
-        whatsapp_link = f"https://wa.me/{settings.WHATSAPP_NUMBER.replace('+', '')}?text={encoded_message}"
-        
         return {
-            "whatsapp_link": whatsapp_link,
+            "whatsapp_link": link_for("treatments", treatment),
             "treatment_name": treatment['name'],
             "phone_number": settings.WHATSAPP_NUMBER
         }
@@ -0,0 +1,168 @@
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.resilience import UpstreamUnavailable
+
+# Weight of a token by the field it appears in; a token found in several
+# fields of the same item adds up their weights
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+
+# A query term matching only the beginning of a token counts for less
+PREFIX_FACTOR = 0.6
+MIN_PREFIX_LENGTH = 2
+
+RESULT_FIELDS = ("id", "name", "category", "price", "image_url", "currency", "duration")
+
+_TOKEN = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, so "Sérum" and "serum" compare equal"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """Inverted index over the name, description and category of active items.
+
+    Like the category index, it is loaded from the repository, kept in sync
+    with admin writes row by row, and reloaded after the catalog cache TTL or
+    when a write touched rows it cannot see (bulk operations). A reload that
+    fails upstream leaves the previous index in place and sets `stale`; one
+    that overlapped a write is used but not marked fresh.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._documents: Dict[Any, dict] = {}
+        self._tokens: Dict[Any, Dict[str, float]] = {}
+        self._loaded_at: Optional[float] = None
+        self._loaded_once = False
+        self._generation = 0
+        self.stale = False
+
+    def is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.CATALOG_CACHE_TTL
+        )
+
+    async def load(self, repository) -> None:
+        generation = self._generation
+        rows = await repository.list(active_only=True)
+        self._postings, self._vocabulary, self._documents, self._tokens = {}, [], {}, {}
+        for row in rows:
+            self._add(row)
+        self._loaded_at = time.monotonic() if generation == self._generation else None
+        self._loaded_once = True
+
+    def apply(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """Replace one row's entry with its new values"""
+        self._generation += 1
+        if self._loaded_at is None:
+            return
+        for row in (old, new):
+            if row and "id" in row:
+                self._remove(row["id"])
+        if new and new.get("is_active"):
+            self._add(new)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+
+    async def search(self, repository, query: str, limit: int) -> List[dict]:
+        """Active items matching every query term, best matches first"""
+        self.stale = False
+        if not self.is_fresh():
+            try:
+                await self.load(repository)
+            except UpstreamUnavailable:
+                if not self._loaded_once:
+                    raise
+                self.stale = True
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores: Optional[Dict[Any, float]] = None
+        for term in terms:
+            term_scores = self._match(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {item_id: score + term_scores[item_id] for item_id, score in scores.items() if item_id in term_scores}
+            if not scores:
+                return []
+
+        # Keep only items scoring at least the limit-th best score before sorting
+        threshold = heapq.nlargest(limit, scores.values())[-1]
+        ranked = sorted(
+            ((item_id, score) for item_id, score in scores.items() if score >= threshold),
+            key=lambda item: (-item[1], self._documents[item[0]]["name"])
+        )[:limit]
+        return [{**self._documents[item_id], "score": round(score, 3)} for item_id, score in ranked]
+
+    def _match(self, term: str) -> Dict[Any, float]:
+        """Best weight per item for one term, exact tokens first, then prefixes"""
+        matches: Dict[Any, float] = dict(self._postings.get(term, {}))
+        if len(term) < MIN_PREFIX_LENGTH:
+            return matches
+
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            token = self._vocabulary[position]
+            position += 1
+            if token == term:
+                continue
+            for item_id, weight in self._postings[token].items():
+                weight *= PREFIX_FACTOR
+                if weight > matches.get(item_id, 0.0):
+                    matches[item_id] = weight
+        return matches
+
+    def _add(self, row: dict) -> None:
+        item_id = row["id"]
+        tokens: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in set(tokenize(row.get(field))):
+                tokens[token] = tokens.get(token, 0.0) + weight
+
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[item_id] = weight
+
+        self._tokens[item_id] = tokens
+        self._documents[item_id] = {field: row[field] for field in RESULT_FIELDS if field in row}
+
+    def _remove(self, item_id: Any) -> None:
+        tokens = self._tokens.pop(item_id, None)
+        self._documents.pop(item_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            postings = self._postings[token]
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+
+search_indexes = {
+    "products": SearchIndex("products"),
+    "treatments": SearchIndex("treatments"),
+}
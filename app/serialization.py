@@ -0,0 +1,47 @@
+import json
+from functools import lru_cache
+from typing import List, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency, stdlib json fallback
+    orjson = None
+
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def encode_rows(rows: List[dict], model: Type[BaseModel]) -> bytes:
+    """Serialize database rows documented as `List[model]`.
+
+    In "validate" mode every row goes through the model, exactly like a
+    response_model with exclude_unset. In "trusted" mode the rows come from
+    our own tables: only the first one is validated, to catch schema drift,
+    and the dicts are encoded as stored (timestamps keep the database format).
+    Listings are encoded once per catalog version, so either cost is paid on
+    cache misses only.
+    """
+    if settings.SERIALIZATION_MODE == "validate":
+        adapter = _list_adapter(model)
+        return adapter.dump_json(adapter.validate_python(rows), exclude_unset=True)
+
+    if rows:
+        model.model_validate(rows[0])
+    return dumps(rows)
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Response for an already serialized JSON body (skips response_model)"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+from app.compression import compress, supported_encodings
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, shared mode stays off
+    fcntl = None
+
+# Control file: published generation, requested generation (both only grow)
+# and the wall-clock time the published one was built
+CONTROL = struct.Struct("<QQd")
+# Data file: length of the JSON index, the index, then the bodies
+# (index offsets are relative to the first body)
+INDEX_LENGTH = struct.Struct("<I")
+
+
+class SharedPayload:
+    """Read-only view of a published snapshot; bodies are memoryviews into the mapping"""
+
+    def __init__(self, mapping: mmap.mmap):
+        (index_length,) = INDEX_LENGTH.unpack_from(mapping, 0)
+        start = INDEX_LENGTH.size + index_length
+        index = json.loads(mapping[INDEX_LENGTH.size:start])
+        view = memoryview(mapping)
+        self.etag: str = index["etag"]
+        self._bodies: Dict[str, memoryview] = {
+            encoding: view[start + offset:start + offset + length]
+            for encoding, (offset, length) in index["bodies"].items()
+        }
+        self.body = self._bodies["identity"]
+
+    def served_encoding(self, encoding: Optional[str]) -> Optional[str]:
+        """Encoding of the body variant() returns for a negotiated encoding"""
+        return encoding if encoding is not None and encoding in self._bodies else None
+
+    async def variant(self, encoding: Optional[str]) -> memoryview:
+        return self._bodies.get(encoding or "identity", self.body)
+
+
+class SharedCatalog:
+    """Catalog snapshot shared by all workers through a memory-mapped file.
+
+    The control file holds two counters. Admin writes in any worker bump the
+    requested generation; the first worker that notices published < requested
+    takes the build lock, builds the snapshot (identity, gzip and brotli
+    bodies) into `<path>.<generation>` and publishes it. Every worker compares
+    the published counter on each read and remaps when it moved, so they all
+    serve the same version and the bodies exist once in the page cache no
+    matter how many workers there are. Put SHARED_SNAPSHOT_PATH on tmpfs
+    (/dev/shm) to keep it in memory.
+
+    Like the local snapshot, a generation older than CATALOG_CACHE_TTL is
+    rebuilt so edits made outside the API show up, and so is one built
+    before this process started (a control file left by a previous deploy).
+    """
+
+    def __init__(self):
+        self._control: Optional[mmap.mmap] = None
+        self._lock_fd: Optional[int] = None
+        self._generation = 0
+        self._payload: Optional[SharedPayload] = None
+        self._building = False
+        self._started_at = time.time()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.SHARED_SNAPSHOT_PATH) and fcntl is not None
+
+    @property
+    def path(self) -> Path:
+        return Path(settings.SHARED_SNAPSHOT_PATH)
+
+    def _open(self) -> None:
+        if self._control is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            fd = os.open(f"{self.path}.control", os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < CONTROL.size:
+                # Nothing published yet, generation 1 requested
+                os.pwrite(fd, CONTROL.pack(0, 1, 0.0), 0)
+            self._control = mmap.mmap(fd, CONTROL.size)
+            os.close(fd)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _counters(self) -> tuple:
+        return CONTROL.unpack_from(self._control, 0)
+
+    def request_rebuild(self) -> None:
+        """Ask for a new generation after an admin write (any worker)"""
+        if not self.enabled:
+            return
+        self._open()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            published, requested, built_at = self._counters()
+            CONTROL.pack_into(self._control, 0, published, requested + 1, built_at)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    async def get(self, build: Callable[[], Awaitable[tuple]]) -> Optional[SharedPayload]:
+        """Current shared snapshot, building it first if this worker wins the lock.
+
+        Returns None while nothing has been published yet and another worker
+        is building, so the caller can fall back to its local snapshot.
+        """
+        self._open()
+        published, requested, built_at = self._counters()
+        if published and published == requested and self._expired(built_at):
+            self._expire(published)
+            published, requested, _ = self._counters()
+        if published < requested and not self._building:
+            await self._try_build(build, requested)
+        return self.current()
+
+    def _expired(self, built_at: float) -> bool:
+        return built_at < self._started_at or time.time() - built_at >= settings.CATALOG_CACHE_TTL
+
+    def _expire(self, generation: int) -> None:
+        """Request a rebuild of an expired generation, unless another worker already did"""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            published, requested, built_at = self._counters()
+            if published == requested == generation:
+                CONTROL.pack_into(self._control, 0, published, requested + 1, built_at)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def current(self) -> Optional[SharedPayload]:
+        """Latest published snapshot without building (None if there is none yet)"""
+        self._open()
+        published, _, _ = self._counters()
+        if published == 0:
+            return None
+        if published != self._generation:
+            try:
+                self._remap(published)
+            except FileNotFoundError:
+                # Superseded and pruned between reading the counter and opening it
+                self._remap(self._counters()[0])
+        return self._payload
+
+    async def _try_build(self, build, requested: int) -> None:
+        builder_fd = os.open(f"{self.path}.build", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(builder_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is building: keep serving the last published one
+            os.close(builder_fd)
+            return
+
+        self._building = True
+        try:
+            published, _, _ = self._counters()
+            if published >= requested:
+                return
+            payload, etag, _ = await build()
+            # Compressing and writing can take a while: off the event loop
+            await asyncio.to_thread(self._write, requested, payload.body, etag)
+            self._publish(requested)
+        finally:
+            self._building = False
+            fcntl.flock(builder_fd, fcntl.LOCK_UN)
+            os.close(builder_fd)
+
+    def _write(self, generation: int, body: bytes, etag: str) -> None:
+        bodies = {"identity": body}
+        if len(body) >= settings.COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                bodies[encoding] = compress(body, encoding)
+
+        layout, offset = {}, 0
+        for encoding, data in bodies.items():
+            layout[encoding] = [offset, len(data)]
+            offset += len(data)
+        index = json.dumps({"etag": etag, "bodies": layout}).encode()
+
+        target = Path(f"{self.path}.{generation}")
+        tmp = target.with_name(f".{target.name}.tmp")
+        with open(tmp, "wb") as file:
+            file.write(INDEX_LENGTH.pack(len(index)))
+            file.write(index)
+            for data in bodies.values():
+                file.write(data)
+        os.replace(tmp, target)
+
+    def _publish(self, generation: int) -> None:
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            _, requested, _ = self._counters()
+            CONTROL.pack_into(self._control, 0, generation, requested, time.time())
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+        # Workers still mapping older files keep them alive until they remap
+        for old in self.path.parent.glob(f"{self.path.name}.*"):
+            suffix = old.name[len(self.path.name) + 1:]
+            if suffix.isdigit() and int(suffix) < generation:
+                old.unlink(missing_ok=True)
+
+    def _remap(self, generation: int) -> None:
+        with open(f"{self.path}.{generation}", "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._payload = SharedPayload(mapping)
+        self._generation = generation
+
+
+shared_catalog = SharedCatalog()
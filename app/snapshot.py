@@ -0,0 +1,83 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Optional
+from app.categories import summarize
+from app.compression import EncodedPayload
+from app.config import settings
+from app.http_cache import catalog_version, make_etag
+from app.models import ProductPartial, TreatmentPartial
+from app.serialization import dumps, encode_rows
+
+SNAPSHOT_TABLES = {"products": ProductPartial, "treatments": TreatmentPartial}
+
+
+class CatalogSnapshot:
+    """Every active product and treatment plus their categories, as one encoded body.
+
+    Built once per catalog version (two list queries, categories counted from
+    the same rows) and kept as pre-encoded bytes with their compressed
+    variants. Admin writes invalidate it through catalog_changed; it is also
+    rebuilt after the catalog cache TTL so writes from other workers show up.
+    Concurrent requests for a cold snapshot share a single build.
+    """
+
+    def __init__(self):
+        self.payload: Optional[EncodedPayload] = None
+        self.etag: Optional[str] = None
+        self.version: Optional[str] = None
+        self._built_at: Optional[float] = None
+        self._generation = 0
+        self._pending: Optional[asyncio.Future] = None
+
+    def is_fresh(self) -> bool:
+        return (
+            self._built_at is not None
+            and time.monotonic() - self._built_at < settings.CATALOG_CACHE_TTL
+        )
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._built_at = None
+        self._pending = None  # requests after a write must not join an older build
+
+    async def get(self, get_repository) -> tuple:
+        """(payload, etag) of the current snapshot, building it if needed"""
+        if self.is_fresh():
+            return self.payload, self.etag
+
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self._rebuild(get_repository))
+        # Shielded: a client disconnecting must not cancel the shared build
+        return await asyncio.shield(self._pending)
+
+    async def _rebuild(self, get_repository) -> tuple:
+        generation = self._generation
+        payload, etag, version = await self.build(get_repository)
+        if generation == self._generation:
+            # Only keep it if no write landed while it was being built
+            self.payload, self.etag, self.version = payload, etag, version
+            self._built_at = time.monotonic()
+        return payload, etag
+
+    async def build(self, get_repository) -> tuple:
+        """Query and encode a new snapshot: (payload, etag, version)"""
+        rows = {}
+        for table in SNAPSHOT_TABLES:
+            rows[table] = await get_repository(table).list(active_only=True)
+
+        version = make_etag(*(catalog_version(rows[table]) for table in SNAPSHOT_TABLES)).strip('"')
+        categories = {
+            table: summarize(Counter(row["category"] for row in rows[table] if row.get("category")))
+            for table in SNAPSHOT_TABLES
+        }
+
+        body = b'{"version":' + dumps(version)
+        for table, model in SNAPSHOT_TABLES.items():
+            body += b',"' + table.encode() + b'":' + encode_rows(rows[table], model)
+        body += b',"categories":' + dumps(categories) + b"}"
+
+        return EncodedPayload(body), f'"{version}"', version
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,38 @@
+import urllib.parse
+from functools import lru_cache
+from typing import Any
+from app.config import settings
+
+CURRENCY_SYMBOLS = {"CRC": "₡", "USD": "$"}
+
+# Columns a row needs to build its link
+LINK_FIELDS = {
+    "products": ("id", "name", "price"),
+    "treatments": ("id", "name", "price", "currency"),
+}
+
+MESSAGES = {
+    "products": "Hola! Me interesa el producto: *{name}*\nPrecio: {price}",
+    "treatments": "Hola! Me interesa reservar: *{name}*\nPrecio: {price}",
+}
+
+
+def format_price(price: float, currency: str = "CRC") -> str:
+    """Price with its currency symbol: colones without decimals, dollars with cents"""
+    symbol = CURRENCY_SYMBOLS.get(currency, f"{currency} ")
+    if currency == "USD":
+        return f"{symbol}{price:,.2f}"
+    return f"{symbol}{price:,.0f}"
+
+
+@lru_cache(maxsize=4096)
+def build_link(table: str, item_id: Any, name: str, price: float, currency: str) -> str:
+    """wa.me link for one item, memoized on every value that appears in it"""
+    message = MESSAGES[table].format(name=name, price=format_price(price, currency))
+    phone = settings.WHATSAPP_NUMBER.replace('+', '')
+    return f"https://wa.me/{phone}?text={urllib.parse.quote(message)}"
+
+
+def link_for(table: str, row: dict) -> str:
+    """WhatsApp inquiry link for a product or treatment row"""
+    return build_link(table, row["id"], row["name"], row["price"], row.get("currency") or "CRC")
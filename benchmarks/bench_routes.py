@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the public and admin routes, run in-process against main.app.
+
+Requests go through httpx's ASGI transport (no sockets) and the data comes from
+the local SQLite backend filled with a synthetic catalog, so runs need no
+network and are comparable between commits on the same machine.
+
+Usage:
+    python benchmarks/bench_routes.py                          # 100, 1k and 10k rows
+    python benchmarks/bench_routes.py --sizes 100 100000 --requests 500
+    python benchmarks/bench_routes.py --output before.json
+    python benchmarks/bench_routes.py --compare before.json    # exit 1 on regression
+
+Each route reports requests/sec and p50/p95/p99 latency. With --compare, a route
+whose p95 grows or whose requests/sec drops by more than --threshold (20% by
+default) is reported as a regression and the script exits with status 1.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Must be set before the app (and its Settings) are imported
+os.environ["DATA_BACKEND"] = "sqlite"
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+
+import httpx  # noqa: E402
+
+CATEGORIES = ["Faciales", "Corporales", "Sérums", "Hidratantes", "Limpiadores", "Paquetes", "Láser", "Consultoría"]
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "latest.json"
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_rows(table, size):
+    """Deterministic catalog rows with spread out timestamps and categories"""
+    rng = random.Random(size)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for index in range(size):
+        created_at = (start + timedelta(minutes=index)).isoformat()
+        row = {
+            "name": f"{table[:-1].capitalize()} {index:06d}",
+            "description": "Descripción de prueba " * rng.randint(1, 12),
+            "price": rng.randint(5, 200) * 1000,
+            "image_url": f"https://cdn.example.com/{table}/{index}.jpg",
+            "category": rng.choice(CATEGORIES),
+            "is_active": rng.random() > 0.1,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        if table == "products":
+            row["stock"] = rng.randint(0, 100)
+        else:
+            row.update(stock=999, duration=f"{rng.choice([30, 45, 60, 90])} minutos", currency=rng.choice(["CRC", "USD"]))
+        rows.append(row)
+    return rows
+
+
+async def seed(size):
+    from app.database import get_repository
+
+    ids = {}
+    for table in ("products", "treatments"):
+        repository = get_repository(table)
+        rows = synthetic_rows(table, size)
+        inserted = []
+        for start in range(0, len(rows), 1000):
+            inserted += await repository.insert(rows[start:start + 1000])
+        ids[table] = [row["id"] for row in inserted]
+    return ids
+
+
+def reset_caches():
+    from app.cache import catalog_cache
+    from app.categories import category_indexes
+
+    catalog_cache.clear()
+    for index in category_indexes.values():
+        index.invalidate()
+
+
+async def measure(client, name, make_request, requests, concurrency):
+    """Run `requests` calls with at most `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(number):
+        nonlocal errors
+        method, url, kwargs = make_request(number)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(number) for number in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def scenarios(ids, headers):
+    """(name, request factory) pairs; factories map a request number to (method, url, kwargs)"""
+    products, treatments = ids["products"], ids["treatments"]
+    pick = random.Random(0).choice
+    created = []
+
+    def create_product(number):
+        return "POST", "/api/admin/products", {"headers": headers, "json": {
+            "name": f"Bench {time.monotonic_ns()} {number}", "price": 1000, "stock": 1, "category": "Bench"
+        }}
+
+    def delete_created(number):
+        return "DELETE", f"/api/admin/products/{created.pop()}", {"headers": headers}
+
+    return [
+        ("GET /api/public/products", lambda n: ("GET", "/api/public/products", {})),
+        ("GET /api/public/products?limit=24", lambda n: ("GET", "/api/public/products?limit=24", {})),
+        ("GET /api/public/products?category", lambda n: ("GET", f"/api/public/products?category={pick(CATEGORIES)}", {})),
+        ("GET /api/public/products/{id}", lambda n: ("GET", f"/api/public/products/{pick(products)}", {})),
+        ("GET /api/public/categories", lambda n: ("GET", "/api/public/categories", {})),
+        ("GET /api/public/whatsapp-link/{id}", lambda n: ("GET", f"/api/public/whatsapp-link/{pick(products)}", {})),
+        ("GET /api/public/treatments", lambda n: ("GET", "/api/public/treatments", {})),
+        ("GET /api/public/treatments/{id}", lambda n: ("GET", f"/api/public/treatments/{pick(treatments)}", {})),
+        ("GET /api/public/treatments/categories", lambda n: ("GET", "/api/public/treatments/categories", {})),
+        ("GET /api/public/whatsapp-treatment/{id}", lambda n: ("GET", f"/api/public/whatsapp-treatment/{pick(treatments)}", {})),
+        ("GET /api/admin/products", lambda n: ("GET", "/api/admin/products", {"headers": headers})),
+        ("POST /api/admin/products", create_product),
+        ("PUT /api/admin/products/{id}", lambda n: ("PUT", f"/api/admin/products/{pick(products)}", {"headers": headers, "json": {"price": 1000 + n}})),
+        ("PATCH /api/admin/products/{id}/toggle-active", lambda n: ("PATCH", f"/api/admin/products/{pick(products)}/toggle-active", {"headers": headers})),
+        ("PATCH /api/admin/products/{id}/stock", lambda n: ("PATCH", f"/api/admin/products/{pick(products)}/stock?new_stock={n % 50}", {"headers": headers})),
+        ("DELETE /api/admin/products/{id}", delete_created),
+    ], created
+
+
+async def run_size(size, requests, concurrency):
+    import main
+    from app.auth import create_access_token
+    from app.database import get_repository
+
+    async with main.app.router.lifespan_context(main.app):
+        reset_caches()
+        ids = await seed(size)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin'})}"}
+        transport = httpx.ASGITransport(app=main.app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            routes, created = scenarios(ids, headers)
+            for name, make_request in routes:
+                count = requests
+                if name.startswith("DELETE"):
+                    # Delete the products created by the POST scenario
+                    bench_rows = await get_repository("products").list(category="Bench", columns=("id", "created_at"))
+                    created[:] = [row["id"] for row in bench_rows]
+                    count = len(created) - min(len(created), concurrency)
+
+                # Warm-up round so first-fill cache misses are not measured
+                await measure(client, name, make_request, min(requests, concurrency), concurrency)
+                results[name] = await measure(client, name, make_request, count, concurrency)
+                result = results[name]
+                print(f"  {name:<48} {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.3f} ms  "
+                      f"p95 {result['p95_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms"
+                      + (f"  errors {result['errors']}" if result["errors"] else ""))
+    return results
+
+
+def compare(baseline, current, threshold):
+    """List of regressions between two result files"""
+    regressions = []
+    for size, routes in current["results"].items():
+        for name, now in routes.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before:
+                continue
+            if now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                regressions.append(f"[{size} rows] {name}: p95 {before['p95_ms']} ms -> {now['p95_ms']} ms")
+            if now["rps"] < before["rps"] * (1 - threshold):
+                regressions.append(f"[{size} rows] {name}: {before['rps']} req/s -> {now['rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="catalog sizes (rows per table)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"\n📊 Catálogo sintético de {size} filas por tabla")
+        report["results"][str(size)] = asyncio.run(run_size(size, args.requests, args.concurrency))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n💾 Resultados guardados en {args.output}")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones (umbral {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones respecto a {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
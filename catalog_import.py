@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Importación y migración del catálogo por lotes (chunked upserts).
+
+Uso:
+    python catalog_import.py seed-products          # productos de add_products.py
+    python catalog_import.py seed-services          # servicios de add_services.py
+    python catalog_import.py migrate-treatments     # products -> treatments
+
+Las filas se escriben con upserts por lotes sobre la clave natural `name`
+(índices únicos en database/schema.sql), así que repetir un comando no duplica
+nada. El progreso se guarda en .import_state/<job>.json: si el proceso se
+interrumpe, la siguiente ejecución continúa donde quedó (--restart para
+empezar de cero). La migración solo limpia la tabla products después de
+verificar que todas las filas existen en treatments.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from supabase import create_client
+from dotenv import load_dotenv
+
+NATURAL_KEY = "name"
+STATE_DIR = Path(__file__).parent / ".import_state"
+
+
+def get_client():
+    load_dotenv()
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY"))
+
+
+class Checkpoint:
+    """Progreso persistente de un trabajo de importación"""
+
+    def __init__(self, job: str, restart: bool = False):
+        self.path = STATE_DIR / f"{job}.json"
+        self.state = {}
+        if restart and self.path.exists():
+            self.path.unlink()
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text())
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def save(self, **values):
+        self.state.update(values)
+        STATE_DIR.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state))
+        tmp.replace(self.path)
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+def upsert_chunks(db, table, rows, checkpoint, chunk_size):
+    """Upsert en lotes sobre la clave natural, guardando el avance tras cada lote"""
+    done = checkpoint.get("rows_done", 0)
+    if done:
+        print(f"↪️  Reanudando {table} desde la fila {done}")
+
+    for start in range(done, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        db.table(table).upsert(chunk, on_conflict=NATURAL_KEY).execute()
+        checkpoint.save(rows_done=start + len(chunk))
+        print(f"✅ {start + len(chunk)}/{len(rows)} filas en {table}")
+
+
+def stream_rows(db, table, page_size, after_id=None):
+    """Lee una tabla por páginas ordenadas por id (keyset), sin cargarla completa"""
+    while True:
+        query = db.table(table).select("*").order("id").limit(page_size)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        page = query.execute().data
+        if not page:
+            return
+        yield page
+        after_id = page[-1]["id"]
+
+
+def count_existing(db, table, names, chunk_size):
+    """Cuántos de los nombres dados existen en la tabla"""
+    found = 0
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        response = db.table(table).select(NATURAL_KEY, count="exact").in_(NATURAL_KEY, chunk).execute()
+        found += response.count or 0
+    return found
+
+
+def seed(table, rows, job, chunk_size=200, restart=False):
+    """Carga idempotente de filas fijas (productos o servicios de ejemplo)"""
+    db = get_client()
+    checkpoint = Checkpoint(job, restart)
+    upsert_chunks(db, table, rows, checkpoint, chunk_size)
+    checkpoint.clear()
+    print(f"\n🎉 {len(rows)} filas sincronizadas en {table}")
+
+
+def product_to_treatment(product):
+    return {
+        'name': product['name'],
+        'description': product['description'],
+        'price': product['price'],
+        'category': product['category'],
+        'image_url': product.get('image_url'),
+        'is_active': product['is_active'],
+        'stock': 999,  # Tratamientos siempre disponibles
+        'duration': None  # Se puede actualizar después
+    }
+
+
+def migrate_products_to_treatments(chunk_size=200, restart=False, cleanup=True):
+    """Copia products a treatments por páginas y limpia products solo si todo llegó"""
+    db = get_client()
+    checkpoint = Checkpoint("migrate-treatments", restart)
+    migrated_ids = checkpoint.get("migrated_ids", [])
+    migrated_names = checkpoint.get("migrated_names", [])
+    last_id = migrated_ids[-1] if migrated_ids else None
+    if last_id is not None:
+        print(f"↪️  Reanudando migración después del producto {last_id}")
+
+    for page in stream_rows(db, "products", chunk_size, after_id=last_id):
+        treatments = [product_to_treatment(product) for product in page]
+        db.table("treatments").upsert(treatments, on_conflict=NATURAL_KEY).execute()
+        migrated_ids += [product["id"] for product in page]
+        migrated_names += [product["name"] for product in page]
+        checkpoint.save(migrated_ids=migrated_ids, migrated_names=migrated_names)
+        print(f"✅ {len(migrated_ids)} productos migrados")
+
+    expected = len(set(migrated_names))
+    found = count_existing(db, "treatments", sorted(set(migrated_names)), chunk_size)
+    print(f"\n🔎 Verificación: {found}/{expected} tratamientos encontrados")
+    if found != expected:
+        print("❌ La verificación falló: la tabla products no se limpió")
+        return False
+
+    if cleanup and migrated_ids:
+        print("\n🧹 Limpiando tabla products...")
+        for start in range(0, len(migrated_ids), chunk_size):
+            db.table("products").delete().in_("id", migrated_ids[start:start + chunk_size]).execute()
+        print("✅ Tabla products limpiada")
+
+    checkpoint.clear()
+    print(f"\n🎉 Migración completada: {len(migrated_ids)} tratamientos")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación y migración del catálogo")
+    parser.add_argument("command", choices=["seed-products", "seed-services", "migrate-treatments"])
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--restart", action="store_true", help="ignorar el progreso guardado")
+    parser.add_argument("--keep-source", action="store_true", help="no limpiar products tras migrar")
+    args = parser.parse_args()
+
+    if args.command == "seed-products":
+        from add_products import products
+        seed("products", products, args.command, args.chunk_size, args.restart)
+    elif args.command == "seed-services":
+        from add_services import services
+        seed("products", services, args.command, args.chunk_size, args.restart)
+    else:
+        migrate_products_to_treatments(args.chunk_size, args.restart, cleanup=not args.keep_source)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,10 @@ CREATE TABLE IF NOT EXISTS products (
 CREATE INDEX IF NOT EXISTS idx_products_is_active ON products(is_active);
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
 CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_products_created_at_id ON products(created_at DESC, id DESC);
+
+-- Natural key used by catalog_import.py for idempotent upserts
+CREATE UNIQUE INDEX IF NOT EXISTS uq_products_name ON products(name);
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE products ENABLE ROW LEVEL SECURITY;
@@ -51,3 +55,124 @@ $$ language 'plpgsql';
 -- Create trigger to automatically update updated_at
 CREATE TRIGGER update_products_updated_at BEFORE UPDATE ON products
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Create treatments table
+CREATE TABLE IF NOT EXISTS treatments (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    price DECIMAL(10, 2) NOT NULL CHECK (price > 0),
+    duration VARCHAR(100),
+    currency VARCHAR(3) NOT NULL DEFAULT 'CRC' CHECK (currency IN ('CRC', 'USD')),
+    stock INTEGER NOT NULL DEFAULT 999 CHECK (stock >= 0),
+    image_url TEXT,
+    category VARCHAR(100),
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_treatments_is_active ON treatments(is_active);
+CREATE INDEX IF NOT EXISTS idx_treatments_category ON treatments(category);
+CREATE INDEX IF NOT EXISTS idx_treatments_created_at_id ON treatments(created_at DESC, id DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_treatments_name ON treatments(name);
+
+CREATE TRIGGER update_treatments_updated_at BEFORE UPDATE ON treatments
+FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Row change events for the API caches (app/change_listener.py LISTENs on
+-- this channel through DATABASE_URL). Only the columns that decide where a
+-- row is listed are sent, NOTIFY payloads are limited to 8000 bytes.
+-- The channel must match CHANGE_LISTENER_CHANNEL (app/config.py).
+CREATE OR REPLACE FUNCTION notify_catalog_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_row JSONB;
+    new_row JSONB;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_row := jsonb_build_object('id', OLD.id, 'category', OLD.category, 'is_active', OLD.is_active);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_row := jsonb_build_object('id', NEW.id, 'category', NEW.category, 'is_active', NEW.is_active);
+    END IF;
+    PERFORM pg_notify('catalog_changes', jsonb_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'old', old_row,
+        'new', new_row
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_products_change AFTER INSERT OR UPDATE OR DELETE ON products
+FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+CREATE TRIGGER notify_treatments_change AFTER INSERT OR UPDATE OR DELETE ON treatments
+FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+-- Active item counts per category (used by the category endpoints)
+CREATE OR REPLACE VIEW product_category_counts AS
+SELECT category, COUNT(*) FILTER (WHERE is_active) AS active_count
+FROM products
+WHERE category IS NOT NULL
+GROUP BY category;
+
+CREATE OR REPLACE VIEW treatment_category_counts AS
+SELECT category, COUNT(*) FILTER (WHERE is_active) AS active_count
+FROM treatments
+WHERE category IS NOT NULL
+GROUP BY category;
+
+-- Atomic is_active toggles (one round trip, no lost updates under concurrency)
+CREATE OR REPLACE FUNCTION toggle_product_active(p_id BIGINT)
+RETURNS SETOF products AS $$
+    UPDATE products
+    SET is_active = NOT is_active, updated_at = NOW()
+    WHERE id = p_id
+    RETURNING *;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION toggle_treatment_active(p_id UUID)
+RETURNS SETOF treatments AS $$
+    UPDATE treatments
+    SET is_active = NOT is_active, updated_at = NOW()
+    WHERE id = p_id
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Bulk partial updates: one statement for a whole JSON array of
+-- {"id": ..., <changed fields>} items. Only keys present in an item are set.
+CREATE OR REPLACE FUNCTION bulk_update_products(items JSONB)
+RETURNS SETOF products AS $$
+    UPDATE products p SET
+        name = CASE WHEN u.item ? 'name' THEN u.item->>'name' ELSE p.name END,
+        description = CASE WHEN u.item ? 'description' THEN u.item->>'description' ELSE p.description END,
+        price = CASE WHEN u.item ? 'price' THEN (u.item->>'price')::DECIMAL ELSE p.price END,
+        stock = CASE WHEN u.item ? 'stock' THEN (u.item->>'stock')::INTEGER ELSE p.stock END,
+        image_url = CASE WHEN u.item ? 'image_url' THEN u.item->>'image_url' ELSE p.image_url END,
+        category = CASE WHEN u.item ? 'category' THEN u.item->>'category' ELSE p.category END,
+        is_active = CASE WHEN u.item ? 'is_active' THEN (u.item->>'is_active')::BOOLEAN ELSE p.is_active END,
+        updated_at = NOW()
+    FROM jsonb_array_elements(items) AS u(item)
+    WHERE p.id = (u.item->>'id')::BIGINT
+    RETURNING p.*;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bulk_update_treatments(items JSONB)
+RETURNS SETOF treatments AS $$
+    UPDATE treatments t SET
+        name = CASE WHEN u.item ? 'name' THEN u.item->>'name' ELSE t.name END,
+        description = CASE WHEN u.item ? 'description' THEN u.item->>'description' ELSE t.description END,
+        price = CASE WHEN u.item ? 'price' THEN (u.item->>'price')::DECIMAL ELSE t.price END,
+        duration = CASE WHEN u.item ? 'duration' THEN u.item->>'duration' ELSE t.duration END,
+        currency = CASE WHEN u.item ? 'currency' THEN u.item->>'currency' ELSE t.currency END,
+        image_url = CASE WHEN u.item ? 'image_url' THEN u.item->>'image_url' ELSE t.image_url END,
+        category = CASE WHEN u.item ? 'category' THEN u.item->>'category' ELSE t.category END,
+        is_active = CASE WHEN u.item ? 'is_active' THEN (u.item->>'is_active')::BOOLEAN ELSE t.is_active END,
+        updated_at = NOW()
+    FROM jsonb_array_elements(items) AS u(item)
+    WHERE t.id = (u.item->>'id')::UUID
+    RETURNING t.*;
+$$ LANGUAGE sql;
@@ -1,19 +1,31 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
 
 from app.config import settings
 from app.routes import public, admin
-from app.database import init_db
+from app.database import init_db, close_db, get_repository
+from app.export import catalog_exporter
+from app.change_listener import change_listener
+from app.metrics import MetricsMiddleware, metrics_response
+from app.profiling import ProfilingMiddleware
+from app.limits import LoadSheddingMiddleware
+from app.compression import CompressionMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database connection on startup"""
     await init_db()
+    catalog_exporter.start(get_repository)
+    change_listener.start(get_repository)
     yield
     # Cleanup on shutdown
+    await change_listener.stop()
+    await catalog_exporter.stop()
+    await close_db()
 
 
 app = FastAPI(
@@ -23,6 +35,18 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Middlewares wrap in reverse order of registration: metrics sees every
+# response (shed ones included), CORS headers are added to rejections too.
+
+# Gzip/brotli for uncached bodies; catalog listings arrive precompressed
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in profiling: admin X-Profile header or PROFILE_SAMPLE_RATE
+app.add_middleware(ProfilingMiddleware)
+
+# Concurrency caps and bounded queues for the public, admin and login routes
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,12 +54,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Missing-Ids", "X-Profile-Id", "X-Cache-Stale", "Retry-After"],
 )
 
+# Request count, in-flight gauge and latency histograms, scraped at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(public.router, prefix="/api/public", tags=["Public"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
+# Static catalog files written by app/export.py (a CDN can serve the same directory)
+if settings.CATALOG_EXPORT_DIR and settings.CATALOG_EXPORT_URL_PATH:
+    os.makedirs(settings.CATALOG_EXPORT_DIR, exist_ok=True)
+    app.mount(
+        settings.CATALOG_EXPORT_URL_PATH,
+        StaticFiles(directory=settings.CATALOG_EXPORT_DIR),
+        name="catalog-export"
+    )
+
 
 @app.get("/")
 async def root():
@@ -49,3 +86,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (HTTP routes and database calls)"""
+    return metrics_response()
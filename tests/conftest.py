@@ -0,0 +1,73 @@
+import os
+
+# Tests run against the in-memory SQLite backend, no Supabase needed
+os.environ["DATA_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = ":memory:"
+os.environ["DATABASE_URL"] = ""
+os.environ["SHARED_SNAPSHOT_PATH"] = ""
+os.environ["CATALOG_EXPORT_DIR"] = ""
+
+import asyncio
+import httpx
+import pytest
+
+from app.auth import create_access_token
+from app.config import settings
+from app.invalidation import catalog_changed
+
+
+class AppClient:
+    """Synchronous wrapper around an httpx client on the app's ASGI transport"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        self._loop = loop
+        self._client = client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The underlying client, for requests that must run concurrently"""
+        return self._client
+
+    def run(self, awaitable):
+        """Run a coroutine on the app's event loop"""
+        return self._loop.run_until_complete(awaitable)
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return self.run(self._client.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+
+@pytest.fixture
+def client():
+    from main import app
+
+    loop = asyncio.new_event_loop()
+    lifespan = app.router.lifespan_context(app)
+    loop.run_until_complete(lifespan.__aenter__())
+    # Caches are module level: start every test from a cold state
+    for table in ("products", "treatments"):
+        catalog_changed(table, reindex=True)
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    try:
+        yield AppClient(loop, http_client)
+    finally:
+        loop.run_until_complete(http_client.aclose())
+        loop.run_until_complete(lifespan.__aexit__(None, None, None))
+        loop.close()
+
+
+@pytest.fixture
+def admin_headers():
+    token = create_access_token({"sub": settings.ADMIN_USERNAME})
+    return {"Authorization": f"Bearer {token}"}
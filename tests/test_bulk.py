@@ -0,0 +1,46 @@
+def test_bulk_invalid_ids_only_fail_their_item(client, admin_headers):
+    created = client.post("/api/admin/products/bulk", json={
+        "create": [{"name": f"Serum {i}", "price": 100, "stock": 1, "category": "A"} for i in range(2)]
+    }, headers=admin_headers).json()
+    ids = [result["id"] for result in created["results"]]
+
+    response = client.post("/api/admin/products/bulk", json={
+        "update": [{"id": ids[0], "price": 150}, {"id": "abc", "price": 150}, {"id": 0, "price": 150}]
+    }, headers=admin_headers)
+    assert response.status_code == 200
+    statuses = [(result["op"], result["status"]) for result in response.json()["results"]]
+    assert statuses == [("update", 200), ("update", 422), ("update", 422)]
+
+
+def test_bulk_treatment_delete_rejects_non_uuid(client, admin_headers):
+    created = client.post("/api/admin/treatments/bulk", json={
+        "create": [{"name": "Facial", "price": 30000}]
+    }, headers=admin_headers).json()
+    treatment_id = created["results"][0]["id"]
+
+    response = client.post("/api/admin/treatments/bulk", json={
+        "delete": [treatment_id, "not-a-uuid"]
+    }, headers=admin_headers)
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [204, 422]
+    assert results[1]["id"] == "not-a-uuid"
+    assert results[1]["error"].startswith("id:")
+
+
+def test_bulk_malformed_delete_ids_only_fail_their_item(client, admin_headers):
+    created = client.post("/api/admin/products/bulk", json={
+        "create": [{"name": "Tónico", "price": 100, "stock": 1, "category": "A"}]
+    }, headers=admin_headers).json()
+    product_id = created["results"][0]["id"]
+
+    response = client.post("/api/admin/products/bulk", json={
+        "delete": [product_id, "abc", None, 2 ** 63]
+    }, headers=admin_headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [204, 422, 422, 422]
+    assert results[1]["id"] == "abc"
+
+    response = client.post("/api/admin/treatments/bulk", json={"delete": [123]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [422]
@@ -0,0 +1,71 @@
+import asyncio
+
+from app.database import get_repository
+
+
+def _create(client, headers, table, **fields):
+    response = client.post(f"/api/admin/{table}", json=fields, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def test_product_update_keeps_category_counts(client, admin_headers):
+    products = [
+        _create(client, admin_headers, "products", name=f"Crema {i}", price=100 + i, stock=5, category="A")
+        for i in range(3)
+    ]
+    assert client.get("/api/public/categories").json()["counts"] == {"A": 3}
+
+    response = client.put(f"/api/admin/products/{products[0]['id']}", json={"price": 200}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/public/categories").json()["counts"] == {"A": 3}
+
+    response = client.put(f"/api/admin/products/{products[0]['id']}", json={"category": "B"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/public/categories").json()["counts"] == {"A": 2, "B": 1}
+
+
+def test_treatment_update_keeps_category_counts(client, admin_headers):
+    treatment = _create(client, admin_headers, "treatments", name="Facial", price=30000, category="Faciales")
+    _create(client, admin_headers, "treatments", name="Peeling", price=40000, category="Faciales")
+    assert client.get("/api/public/treatments/categories").json()["counts"] == {"Faciales": 2}
+
+    response = client.put(f"/api/admin/treatments/{treatment['id']}", json={"duration": "60 min"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/public/treatments/categories").json()["counts"] == {"Faciales": 2}
+
+
+def test_empty_category_listing_is_invalidated(client, admin_headers):
+    product = _create(client, admin_headers, "products", name="Tónico", price=100, stock=5, category="A")
+    assert len(client.get("/api/public/products?category=").json()) == 1
+
+    client.delete(f"/api/admin/products/{product['id']}", headers=admin_headers)
+    assert client.get("/api/public/products?category=").json() == []
+
+
+def test_counts_loaded_during_a_write_are_reloaded(client, admin_headers, monkeypatch):
+    product = _create(client, admin_headers, "products", name="Gel", price=100, stock=5, category="A")
+    repository = get_repository("products")
+    original_counts = repository.category_counts
+    loading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_counts():
+        counts = await original_counts()
+        loading.set()
+        await release.wait()
+        return counts
+
+    monkeypatch.setattr(repository, "category_counts", slow_counts)
+
+    async def counts_during_toggle():
+        counts = asyncio.ensure_future(client.async_client.get("/api/public/categories"))
+        await loading.wait()
+        response = await client.async_client.patch(
+            f"/api/admin/products/{product['id']}/toggle-active", headers=admin_headers
+        )
+        assert response.status_code == 200
+        release.set()
+        return await counts
+
+    assert client.run(counts_during_toggle()).json()["counts"] == {"A": 1}
+    assert client.get("/api/public/categories").json()["counts"] == {}
@@ -0,0 +1,51 @@
+from app.change_listener import change_listener
+from app.database import get_repository
+
+
+def _event(op, old=None, new=None):
+    """Payload as sent by the notify_catalog_change trigger"""
+    columns = ("id", "category", "is_active")
+    return {
+        "table": "products",
+        "op": op,
+        "old": {column: old[column] for column in columns} if old else None,
+        "new": {column: new[column] for column in columns} if new else None,
+    }
+
+
+def _catalog(client):
+    """What the cached listings, category counts and search index currently serve"""
+    return (
+        [item["name"] for item in client.get("/api/public/products").json()],
+        [item["name"] for item in client.get("/api/public/products?category=A").json()],
+        client.get("/api/public/categories").json()["counts"],
+        [result["name"] for result in client.get("/api/public/search?q=crema&type=products").json()["results"]],
+    )
+
+
+def test_change_events_invalidate_caches(client, monkeypatch):
+    repository = get_repository("products")
+    monkeypatch.setattr(change_listener, "_get_repository", get_repository)
+
+    def notify(*events):
+        client.run(change_listener.handle(list(events)))
+
+    # Writes go behind the API's back, like edits in the Supabase dashboard:
+    # the caches keep serving the old catalog until the event arrives
+    assert _catalog(client) == ([], [], {}, [])
+    row = client.run(repository.insert([{"name": "Crema", "price": 100, "stock": 5, "category": "A"}]))[0]
+    assert _catalog(client) == ([], [], {}, [])
+    notify(_event("INSERT", new=row))
+    assert _catalog(client) == (["Crema"], ["Crema"], {"A": 1}, ["Crema"])
+
+    updated = client.run(repository.update(row["id"], {"name": "Crema nutritiva"}))
+    notify(_event("UPDATE", old=row, new=updated))
+    assert _catalog(client) == (["Crema nutritiva"], ["Crema nutritiva"], {"A": 1}, ["Crema nutritiva"])
+
+    moved = client.run(repository.update(row["id"], {"category": "B"}))
+    notify(_event("UPDATE", old=updated, new=moved))
+    assert _catalog(client) == (["Crema nutritiva"], [], {"B": 1}, ["Crema nutritiva"])
+
+    client.run(repository.delete(row["id"]))
+    notify(_event("DELETE", old=moved))
+    assert _catalog(client) == ([], [], {}, [])
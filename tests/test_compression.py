@@ -0,0 +1,57 @@
+import asyncio
+
+from app.compression import compress
+from app.config import settings
+
+
+def _create_many(client, headers, count):
+    response = client.post("/api/admin/products/bulk", json={
+        "create": [
+            {"name": f"Crema {i}", "price": 100 + i, "stock": 5, "category": "A", "description": "Hidratante " * 20}
+            for i in range(count)
+        ]
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_listing_etag_is_per_encoding(client, admin_headers):
+    _create_many(client, admin_headers, 20)
+
+    gzipped = client.get("/api/public/products", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/api/public/products", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in identity.headers
+    assert gzipped.headers["ETag"] != identity.headers["ETag"]
+    assert gzipped.json() == identity.json()
+
+    response = client.get("/api/public/products", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]
+    })
+    assert response.status_code == 304
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    # A cached gzip body must not be revalidated for a client that cannot decode it
+    response = client.get("/api/public/products", headers={
+        "Accept-Encoding": "identity", "If-None-Match": gzipped.headers["ETag"]
+    })
+    assert response.status_code == 200
+
+
+def test_large_uncached_bodies_are_compressed_in_a_thread(client, admin_headers, monkeypatch):
+    _create_many(client, admin_headers, 20)
+    monkeypatch.setattr(settings, "COMPRESSION_THREAD_MIN_SIZE", 2048)
+    threaded = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(function, *args):
+        threaded.append(function)
+        return await to_thread(function, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", recording_to_thread)
+
+    compressed = client.get("/api/admin/products", headers={**admin_headers, "Accept-Encoding": "gzip"})
+    plain = client.get("/api/admin/products", headers={**admin_headers, "Accept-Encoding": "identity"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert len(plain.content) >= 2048
+    assert compressed.json() == plain.json()
+    assert threaded == [compress]
@@ -0,0 +1,25 @@
+def _create(client, headers, table, **fields):
+    response = client.post(f"/api/admin/{table}", json=fields, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def test_malformed_ids_are_reported_missing(client, admin_headers):
+    product = _create(client, admin_headers, "products", name="Crema", price=100, stock=5, category="A")
+    treatment = _create(client, admin_headers, "treatments", name="Facial", price=30000, category="Faciales")
+
+    response = client.get(f"/api/public/treatments?ids={treatment['id']},not-a-uuid")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [treatment["id"]]
+    assert response.headers["X-Missing-Ids"] == "not-a-uuid"
+
+    response = client.get(f"/api/public/products?ids=abc,{product['id']},{2 ** 63}")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [product["id"]]
+    assert response.headers["X-Missing-Ids"] == f"abc,{2 ** 63}"
+
+    response = client.get(f"/api/public/whatsapp-links?products={product['id']},0&treatments=x1,{treatment['id']}")
+    assert response.status_code == 200
+    body = response.json()
+    assert [link["id"] for link in body["links"]] == [product["id"], treatment["id"]]
+    assert body["missing"] == {"products": ["0"], "treatments": ["x1"]}
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.database import get_repository
+
+
+def _create(client, headers, table, **fields):
+    response = client.post(f"/api/admin/{table}", json=fields, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def test_listing_fetched_during_a_write_is_not_cached(client, admin_headers, monkeypatch):
+    product = _create(client, admin_headers, "products", name="Sérum", price=100, stock=5, category="A")
+    repository = get_repository("products")
+    original_list = repository.list
+    fetching, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_list(*args, **kwargs):
+        rows = await original_list(*args, **kwargs)
+        fetching.set()
+        await release.wait()
+        return rows
+
+    monkeypatch.setattr(repository, "list", slow_list)
+
+    async def listing_during_toggle():
+        listing = asyncio.ensure_future(client.async_client.get("/api/public/products"))
+        await fetching.wait()
+        response = await client.async_client.patch(
+            f"/api/admin/products/{product['id']}/toggle-active", headers=admin_headers
+        )
+        assert response.status_code == 200
+        release.set()
+        return await listing
+
+    before = client.run(listing_during_toggle())
+    assert [item["id"] for item in before.json()] == [product["id"]]
+    assert client.get("/api/public/products").json() == []
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.database import get_repository
+
+
+def _create(client, headers, table, **fields):
+    response = client.post(f"/api/admin/{table}", json=fields, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def _names(response):
+    return [result["name"] for result in response.json()["results"]]
+
+
+def test_index_loaded_during_a_write_is_reloaded(client, admin_headers, monkeypatch):
+    _create(client, admin_headers, "products", name="Crema hidratante", price=100, stock=5, category="A")
+    repository = get_repository("products")
+    original_list = repository.list
+    loading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_list(*args, **kwargs):
+        rows = await original_list(*args, **kwargs)
+        loading.set()
+        await release.wait()
+        return rows
+
+    monkeypatch.setattr(repository, "list", slow_list)
+
+    async def search_during_create():
+        search = asyncio.ensure_future(client.async_client.get("/api/public/search?q=crema&type=products"))
+        await loading.wait()
+        response = await client.async_client.post(
+            "/api/admin/products",
+            json={"name": "Crema solar", "price": 120, "stock": 5, "category": "A"},
+            headers=admin_headers
+        )
+        assert response.status_code in (200, 201), response.text
+        release.set()
+        return await search
+
+    assert _names(client.run(search_during_create())) == ["Crema hidratante"]
+    assert sorted(_names(client.get("/api/public/search?q=crema&type=products"))) == ["Crema hidratante", "Crema solar"]